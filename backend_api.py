@@ -4,16 +4,33 @@ Skibidi-fication 3000 Backend API
 FastAPI backend for processing PDFs into brainrot videos.
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
+import re
 import shutil
+import hashlib
+import socket
+import threading
 from pathlib import Path
-from brainrot_turbo import generate_brainrot_turbo
+from brainrot_cache import cache_key
+from brainrot_turbo import (
+    HLS_PLAYLIST_NAME,
+    NARRATION_CHARS_PER_SECOND,
+    RENDER_SEGMENT_THREADS,
+    RENDER_SEGMENTS,
+    pipeline_settings_key,
+    source_char_budget,
+)
+from job_scheduler import JobScheduler, QueueFullError
+from job_store import get_job_store
+import metrics
+from render_worker import render_job, warm_up
 import uuid
 import time
+from typing import Optional
 
 app = FastAPI(title="Skibidi-fication 3000 API")
 
@@ -32,8 +49,122 @@ OUTPUT_DIR = Path("outputs")
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-# Store processing status
-processing_status = {}
+# Looping background shared by every job
+BACKGROUND_VIDEO = "subway.mp4"
+
+# "staged" runs extract -> translate -> TTS -> render one after another,
+# "streaming" overlaps them (see brainrot_streaming)
+DEFAULT_PIPELINE = os.getenv("BRAINROT_PIPELINE", "staged")
+PIPELINES = ("staged", "streaming")
+
+# "single" renders with one FFmpeg encode (and writes HLS as it goes),
+# "parallel" encodes segments on all cores and joins them at the end
+DEFAULT_RENDER_MODE = os.getenv("BRAINROT_RENDER_MODE", "single")
+RENDER_MODES = ("single", "parallel")
+
+# Staged renders also write an HLS rendition (outputs/<job_id>_hls/) that can be
+# played from /api/hls/<job_id>/playlist.m3u8 while the encode is still running
+HLS_OUTPUT = os.getenv("BRAINROT_HLS_OUTPUT", "1") == "1"
+HLS_FILENAME = re.compile(r'^[\w.-]+\.(m3u8|m4s|mp4)$')
+HLS_MEDIA_TYPES = {
+    "m3u8": "application/vnd.apple.mpegurl",
+    "m4s": "video/iso.segment",
+    "mp4": "video/mp4",
+}
+
+# Profile the render stage of every job (or per job with ?profile=true)
+PROFILE_BY_DEFAULT = os.getenv("BRAINROT_PROFILE", "0") == "1"
+
+# Finished artifacts never change under their URL, so browsers and CDNs may keep them
+ARTIFACT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_CHUNK_BYTES = 256 * 1024
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Uploads are streamed to disk in chunks and rejected past this size
+MAX_UPLOAD_BYTES = int(os.getenv("BRAINROT_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+# Room for the multipart boundaries and part headers around the PDF in Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Job status lives in a store shared by all API workers (SQLite by default)
+job_store = get_job_store()
+
+# Bounded queue + worker pools for processing jobs. Renders run in separate processes,
+# unless the job store lives in this process only - they report progress through it.
+scheduler = JobScheduler(render_initializer=warm_up, render_initargs=(BACKGROUND_VIDEO,),
+                         render_processes=job_store.shared_between_processes)
+
+# Prometheus metrics served at /metrics
+metrics.install(scheduler)
+
+# Queued/processing jobs hold a lease that the API process running them keeps renewing.
+# Once it runs out (that process exited, restarted or hung), the job is orphaned:
+# it is failed at startup or when polled, and /api/process may queue it again.
+JOB_LEASE_SECONDS = int(os.getenv("BRAINROT_JOB_LEASE_SECONDS", "60"))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Bookkeeping kept on the job record but not returned by /api/status
+INTERNAL_JOB_FIELDS = ("owner", "lease_deadline", "content_key", "base_content_key")
+
+
+@app.on_event("startup")
+def prepare_background_video():
+    """Transcode the background once so jobs can loop it by stream copy"""
+    from brainrot_turbo import prepare_background
+
+    if not os.path.exists(BACKGROUND_VIDEO):
+        print(f"⚠️  Warning: {BACKGROUND_VIDEO} not found - videos cannot be rendered")
+    else:
+        try:
+            prepare_background(BACKGROUND_VIDEO)
+        except Exception as e:
+            print(f"⚠️  Could not prepare {BACKGROUND_VIDEO} ({e}) - jobs will use the original file")
+
+    # Spawn the render workers now (after the background is on disk), not on the first job
+    scheduler.prewarm()
+
+
+def is_orphaned(job):
+    """True for a queued/processing job whose API process stopped renewing its lease."""
+    return job["status"] in ("queued", "processing") and (job.get("lease_deadline") or 0) < time.time()
+
+
+def fail_orphaned_job(job_id):
+    print(f"⚠️  Job {job_id} was orphaned by a stopped worker - marking it failed")
+    metrics.JOBS.labels("failed").inc()
+    return job_store.update(
+        job_id,
+        status="failed",
+        error="The server processing this job stopped. Process it again.",
+        step="❌ Interrupted",
+        eta_deadline=None
+    )
+
+
+def renew_job_leases():
+    """Keep the leases of this process's jobs alive (runs on a daemon thread)."""
+    while True:
+        deadline = time.time() + JOB_LEASE_SECONDS
+        try:
+            for job_id in scheduler.active_jobs():
+                job_store.update(job_id, lease_deadline=deadline)
+        except Exception as e:
+            print(f"  > Could not renew job leases: {e}")
+        time.sleep(JOB_LEASE_SECONDS / 3)
+
+
+@app.on_event("startup")
+def recover_orphaned_jobs():
+    """Fail jobs left behind by workers that are gone, then start renewing this worker's leases"""
+    for job_id, job in job_store.find_by_status("queued", "processing"):
+        if is_orphaned(job):
+            fail_orphaned_job(job_id)
+
+    threading.Thread(target=renew_job_leases, name="brainrot-leases", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_scheduler():
+    scheduler.shutdown()
 
 
 @app.get("/")
@@ -41,36 +172,247 @@ def root():
     return {"message": "Skibidi-fication 3000 API - Ready to cook 🔥"}
 
 
-@app.post("/api/upload")
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload a PDF file and start processing"""
+def upload_too_large():
+    return HTTPException(status_code=413, detail=f"PDF is too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)")
+
+
+async def receive_pdf_upload(request: Request, dest: Path):
+    """
+    Stream the "file" part of a multipart upload to dest, hashing it as it arrives.
 
-    # Validate file type
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    The body is parsed straight from request.stream(): FastAPI's own form
+    parsing spools the whole body to disk before the endpoint runs, so an
+    oversized upload could only be rejected once it had been received.
+    Here it is rejected from its Content-Length, or as soon as the file
+    part passes MAX_UPLOAD_BYTES.
+
+    Returns (filename, sha256 hex digest).
+    """
+    try:
+        from python_multipart.multipart import MultipartParser, parse_options_header
+    except ImportError:  # python-multipart < 0.0.13
+        from multipart.multipart import MultipartParser, parse_options_header
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise upload_too_large()
+
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload with a PDF file")
+
+    sha256 = hashlib.sha256()
+    part = {"headers": {}, "field": b"", "value": b"", "is_file": False}
+    upload = {"filename": None, "size": 0}
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", is_file=False)
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"], part["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition"))
+        if disposition.get(b"name") != b"file" or upload["filename"] is not None:
+            return
+        filename = disposition.get(b"filename", b"").decode("utf-8", "replace")
+        if not filename.endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        upload["filename"] = filename
+        part["is_file"] = True
+
+    def on_part_data(data, start, end):
+        if not part["is_file"]:
+            return
+        upload["size"] += end - start
+        if upload["size"] > MAX_UPLOAD_BYTES:
+            raise upload_too_large()
+        chunk = data[start:end]
+        sha256.update(chunk)
+        buffer.write(chunk)
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    try:
+        with open(dest, "wb") as buffer:
+            async for chunk in request.stream():
+                parser.write(chunk)
+            parser.finalize()
+        if upload["filename"] is None:
+            raise HTTPException(status_code=400, detail="No PDF file in the upload")
+    except ValueError as e:  # python-multipart's parse errors
+        dest.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"Malformed upload: {e}")
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    return upload["filename"], sha256.hexdigest()
+
+
+@app.post("/api/upload")
+async def upload_pdf(request: Request):
+    """Upload a PDF file (multipart field "file") and start processing"""
 
     # Generate unique ID for this job
     job_id = str(uuid.uuid4())
 
-    # Save uploaded file
+    # Stream the upload to disk as it arrives, hashing as we go
     pdf_path = UPLOAD_DIR / f"{job_id}.pdf"
-    with open(pdf_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    partial_path = UPLOAD_DIR / f".{job_id}.part"
+    filename, content_hash = await receive_pdf_upload(request, partial_path)
+    os.replace(partial_path, pdf_path)
 
     # Initialize status
-    processing_status[job_id] = {
-        "status": "uploaded",
-        "progress": 0,
-        "filename": file.filename
-    }
+    job_store.create(
+        job_id,
+        status="uploaded",
+        progress=0,
+        filename=filename,
+        content_hash=content_hash,
+        # Never changes - process_pdf derives the key of each page range from it
+        base_content_key=get_content_key(content_hash)
+    )
 
     return JSONResponse({
         "job_id": job_id,
         "message": "PDF uploaded successfully. Ready to skibidi-fy!",
-        "filename": file.filename
+        "filename": filename
     })
 
 
+def get_content_key(content_hash):
+    """Identify a PDF + pipeline settings + background combination."""
+    try:
+        background_stat = os.stat(BACKGROUND_VIDEO)
+        background = (BACKGROUND_VIDEO, background_stat.st_mtime_ns, background_stat.st_size)
+    except FileNotFoundError:
+        background = (BACKGROUND_VIDEO, None, None)
+    return cache_key("job", content_hash, pipeline_settings_key(), background)
+
+
+def find_completed_duplicate(content_key, exclude_job_id=None):
+    """Completed job with the same content whose video is still on disk, as (job_id, job), or None."""
+    duplicate = job_store.find_completed(content_key, exclude_job_id)
+    if duplicate is None:
+        return None
+    artifact_job_id = duplicate[1].get("artifact_job_id") or duplicate[0]
+    if not (OUTPUT_DIR / f"{artifact_job_id}.mp4").exists():
+        return None
+    duplicate[1]["artifact_job_id"] = artifact_job_id
+    return duplicate
+
+
+# Pipeline stages in order. Each stage's size is measured in its own unit:
+# extract = PDF megabytes, translate = PDF characters,
+# tts = narration characters, render = narration audio seconds
+STAGES = ("extract", "translate", "tts", "render")
+
+# Cold-start seconds per unit, used until real runs have been recorded
+# ("stream" is the whole overlapped translate/TTS/render stage, per PDF character)
+DEFAULT_STAGE_RATES = {
+    "extract": 2.0,
+    "translate": 0.003,
+    "tts": 0.005,
+    "render": 0.5,
+    "stream": 0.004,
+}
+
+# Sizes assumed for stages whose input doesn't exist yet
+TYPICAL_NARRATION_CHARS = 3500  # The prompt asks for 3-5 minutes of narration
+TYPICAL_STAGE_UNITS = {
+    "extract": 1.0,
+    "translate": source_char_budget(),
+    "tts": TYPICAL_NARRATION_CHARS,
+    "render": TYPICAL_NARRATION_CHARS / NARRATION_CHARS_PER_SECOND,
+    "stream": source_char_budget(),
+}
+
+# Stages slower than this multiple of their estimate, and at least
+# SLOW_STAGE_MIN_EXCESS seconds over it, get logged
+SLOW_STAGE_FACTOR = 2.0
+SLOW_STAGE_MIN_EXCESS = 5.0
+
+
+def estimate_stage_seconds(stage, units):
+    """Expected duration of a stage from recorded per-unit rates."""
+    rate = job_store.stage_rate(stage) or DEFAULT_STAGE_RATES[stage]
+    return rate * units.get(stage, TYPICAL_STAGE_UNITS[stage])
+
+
+def estimate_eta_seconds(from_stage, units):
+    """Expected time from the start of from_stage to the end of the job."""
+    return sum(estimate_stage_seconds(stage, units) for stage in STAGES[STAGES.index(from_stage):])
+
+
+def enter_stage(job_id, stage, progress, step, units):
+    job_store.update(
+        job_id,
+        stage=stage,
+        progress=progress,
+        step=step,
+        eta_deadline=time.time() + estimate_eta_seconds(stage, units)
+    )
+
+
+def finish_stage(stage, stage_start, units):
+    """Record how long a stage took for its input size so future ETAs learn from it."""
+    seconds = time.time() - stage_start
+    expected = estimate_stage_seconds(stage, units)
+    job_store.record_stage_duration(stage, seconds, units[stage])
+    metrics.observe_stage(stage, seconds)
+    if seconds > SLOW_STAGE_FACTOR * expected and seconds - expected > SLOW_STAGE_MIN_EXCESS:
+        print(f"🐢 Slow {stage} stage: {seconds:.1f}s (expected ~{expected:.1f}s for {units[stage]:.0f} units)")
+
+
+def process_pdf_streaming(job_id: str, job: dict, pdf_path: Path, output_video: Path, audio_path: str):
+    """Streaming pipeline: translate, TTS and render overlap (see brainrot_streaming)"""
+    from brainrot_streaming import generate_brainrot_streaming
+
+    units = {"extract": pdf_path.stat().st_size / 1e6}
+    job_store.update(
+        job_id,
+        stage="stream",
+        eta_deadline=time.time() + estimate_stage_seconds("extract", units) + estimate_stage_seconds("stream", units)
+    )
+    stage_start = time.time()
+
+    def report_progress(progress, step):
+        job_store.update(job_id, progress=progress, step=step)
+
+    # Segment renders go through the bounded render process pool
+    result = generate_brainrot_streaming(
+        str(pdf_path),
+        BACKGROUND_VIDEO,
+        str(output_video),
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        page_range=job.get("page_range"),
+        file_hash=job.get("content_hash"),
+        audio_path=audio_path,
+        run_render=scheduler.run_render,
+        progress_callback=report_progress
+    )
+
+    units["stream"] = result["pdf_chars"]
+    finish_stage("stream", stage_start, units)
+    if result["render_path"] == "fallback":
+        print(f"⚠️  Job {job_id}: segment renders failed - the video was rendered after the narration instead")
+
+
 def process_pdf_background(job_id: str):
     """Background task for processing PDF"""
 
@@ -78,154 +420,435 @@ def process_pdf_background(job_id: str):
     start_time = time.time()
 
     try:
+        job = job_store.get(job_id)
+        if job.get("pipeline") == "streaming":
+            job_store.update(job_id, status="processing", start_time=start_time)
+            process_pdf_streaming(job_id, job, pdf_path, OUTPUT_DIR / f"{job_id}.mp4",
+                                  str(OUTPUT_DIR / f"{job_id}_audio.mp3"))
+            complete_job(job_id, start_time)
+            return
+
+        # Stage sizes drive the ETA; unknown ones are estimated until the previous stage finishes
+        units = {"extract": pdf_path.stat().st_size / 1e6}
+
         # Update status: Starting
-        processing_status[job_id].update({
-            "status": "processing",
-            "progress": 5,
-            "step": "🔍 Extracting text from PDF...",
-            "start_time": start_time,
-            "eta_seconds": 180  # Estimated 3 minutes
-        })
+        job_store.update(job_id, status="processing", start_time=start_time)
 
         # Define output paths
         output_video = OUTPUT_DIR / f"{job_id}.mp4"
 
         # Step 1: Extract text (5-15%)
         from brainrot_turbo import extract_text_from_pdf
-        processing_status[job_id].update({
-            "progress": 10,
-            "step": "📄 Extracting text from PDF...",
-            "eta_seconds": 170
-        })
-        pdf_text = extract_text_from_pdf(str(pdf_path))
+        enter_stage(job_id, "extract", 5, "📄 Extracting text from PDF...", units)
+        stage_start = time.time()
+        # Only read as much of the PDF as the narration budget can use
+        pdf_text = extract_text_from_pdf(
+            str(pdf_path),
+            file_hash=job.get("content_hash"),
+            page_range=job.get("page_range"),
+            max_chars=source_char_budget()
+        )
+        finish_stage("extract", stage_start, units)
 
-        # Step 2: Translate to brainrot (15-35%)
+        units["translate"] = len(pdf_text)
+        units["tts"] = min(len(pdf_text), TYPICAL_NARRATION_CHARS)
+        units["render"] = units["tts"] / NARRATION_CHARS_PER_SECOND
+
+        # Step 2: Translate to brainrot (15-40%)
         from brainrot_turbo import brainrot_translate_turbo
-        processing_status[job_id].update({
-            "progress": 20,
-            "step": "🔥 Translating to Gen Z brainrot (GPT-5-nano)...",
-            "eta_seconds": 150
-        })
+        enter_stage(job_id, "translate", 15, "🔥 Translating to Gen Z brainrot (GPT-5-nano)...", units)
+        stage_start = time.time()
         brainrot_text = brainrot_translate_turbo(pdf_text, os.getenv("OPENAI_API_KEY"))
+        finish_stage("translate", stage_start, units)
+
+        units["tts"] = len(brainrot_text)
+        units["render"] = units["tts"] / NARRATION_CHARS_PER_SECOND
 
-        # Step 3: Generate audio (35-60%)
+        # Step 3: Generate audio (40-65%)
         from brainrot_turbo import generate_tts_audio
-        processing_status[job_id].update({
-            "progress": 40,
-            "step": "🎤 Generating voice narration (OpenAI TTS)...",
-            "eta_seconds": 120
-        })
+        enter_stage(job_id, "tts", 40, "🎤 Generating voice narration (OpenAI TTS)...", units)
+        stage_start = time.time()
         audio_path = str(OUTPUT_DIR / f"{job_id}_audio.mp3")
         generate_tts_audio(brainrot_text, audio_path, None, os.getenv("OPENAI_API_KEY"))
-
-        # Step 4: Create video (60-95%)
-        from brainrot_turbo import create_video_with_audio_ffmpeg
-        processing_status[job_id].update({
-            "progress": 65,
-            "step": "🎬 Creating video with text overlays...",
-            "eta_seconds": 90
-        })
-
-        # Update progress periodically during video creation
-        def update_video_progress():
-            for i in range(65, 95, 5):
-                if processing_status[job_id]["status"] != "processing":
-                    break
-                time.sleep(5)
-                processing_status[job_id].update({
-                    "progress": i,
-                    "step": f"🎬 Rendering video... ({i}%)",
-                    "eta_seconds": max(10, 90 - (i - 65))
-                })
-
-        import threading
-        progress_thread = threading.Thread(target=update_video_progress)
-        progress_thread.start()
-
-        create_video_with_audio_ffmpeg(
-            "subway.mp4",
+        finish_stage("tts", stage_start, units)
+
+        # Step 4: Create video (65-99%) - the render worker reports real encoder progress
+        enter_stage(job_id, "render", 65, "🎬 Creating video with text overlays...", units)
+        stage_start = time.time()
+
+        # CPU-heavy render runs in the bounded render process pool, not in the API process
+        render_mode = job.get("render_mode") or DEFAULT_RENDER_MODE
+        profile_path = str(OUTPUT_DIR / f"{job_id}_profile") if job.get("profile") else None
+        result = scheduler.run_render(
+            render_job,
+            job_id,
+            BACKGROUND_VIDEO,
             audio_path,
             brainrot_text,
-            str(output_video)
+            str(output_video),
+            hls_dir=str(hls_dir_for(job_id)) if HLS_OUTPUT and render_mode == "single" else None,
+            hls_url=f"/api/hls/{job_id}/{HLS_PLAYLIST_NAME}",
+            render_mode=render_mode,
+            profile_path=profile_path,
+            # Fill the cores the other renders in flight leave free
+            segments=max(1, min(RENDER_SEGMENTS, scheduler.render_cores() // RENDER_SEGMENT_THREADS))
         )
+        units["render"] = result["audio_duration"]
+        finish_stage("render", stage_start, units)
+        # "render" includes waiting for a render worker; "encode" is the worker's own time
+        metrics.observe_stage("encode", result["render_seconds"])
+        metrics.observe_render(result["frames"], result["render_seconds"])
+        if profile_path:
+            job_store.update(job_id, profile_url=f"/api/profile/{job_id}")
 
-        # Complete
-        elapsed_time = time.time() - start_time
-        processing_status[job_id].update({
-            "status": "completed",
-            "progress": 100,
-            "step": "✅ Completed!",
-            "video_url": f"/api/video/{job_id}",
-            "eta_seconds": 0,
-            "elapsed_time": int(elapsed_time)
-        })
-
-        print(f"✅ Job {job_id} completed in {elapsed_time:.1f}s")
+        complete_job(job_id, start_time)
 
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
         print(f"\n❌ ERROR in video processing for job {job_id}:")
         print(error_details)
-        processing_status[job_id].update({
-            "status": "failed",
-            "error": str(e),
-            "step": "❌ Failed"
-        })
+        job_store.update(
+            job_id,
+            status="failed",
+            error=str(e),
+            step="❌ Failed",
+            eta_deadline=None
+        )
+        metrics.JOBS.labels("failed").inc()
+
+
+def complete_job(job_id: str, start_time: float):
+    elapsed_time = time.time() - start_time
+    job_store.update(
+        job_id,
+        status="completed",
+        progress=100,
+        step="✅ Completed!",
+        video_url=f"/api/video/{job_id}",
+        artifact_job_id=job_id,
+        eta_seconds=0,
+        eta_deadline=None,
+        elapsed_time=int(elapsed_time)
+    )
 
+    metrics.JOBS.labels("completed").inc()
+    print(f"✅ Job {job_id} completed in {elapsed_time:.1f}s")
 
-@app.post("/api/process/{job_id}")
-async def process_pdf(job_id: str, background_tasks: BackgroundTasks):
-    """Start processing the uploaded PDF (async with background task)"""
 
-    if job_id not in processing_status:
+@app.post("/api/process/{job_id}")
+async def process_pdf(job_id: str, start_page: Optional[int] = None, end_page: Optional[int] = None,
+                      pipeline: Optional[str] = None, render_mode: Optional[str] = None,
+                      profile: Optional[bool] = None):
+    """Queue the uploaded PDF for processing (429 when the queue is full)
+
+    start_page/end_page (1-based, inclusive) limit which pages are narrated.
+    pipeline is "staged" or "streaming" (default: BRAINROT_PIPELINE).
+    render_mode is "single" or "parallel" (default: BRAINROT_RENDER_MODE; staged pipeline only).
+    profile captures a render profile, served from /api/profile/{job_id}
+    (default: BRAINROT_PROFILE; staged pipeline only).
+    """
+
+    job = job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job ID not found")
 
+    if job["status"] in ("queued", "processing") and not is_orphaned(job):
+        # Already admitted - don't queue the same job twice
+        return JSONResponse({
+            "job_id": job_id,
+            "status": job["status"],
+            "queue_position": scheduler.queue_position(job_id),
+            "message": "Job is already being processed."
+        })
+
     pdf_path = UPLOAD_DIR / f"{job_id}.pdf"
     if not pdf_path.exists():
         raise HTTPException(status_code=404, detail="PDF file not found")
 
+    pipeline = pipeline or DEFAULT_PIPELINE
+    if pipeline not in PIPELINES:
+        raise HTTPException(status_code=400, detail=f"pipeline must be one of {', '.join(PIPELINES)}")
+    render_mode = render_mode or DEFAULT_RENDER_MODE
+    if render_mode not in RENDER_MODES:
+        raise HTTPException(status_code=400, detail=f"render_mode must be one of {', '.join(RENDER_MODES)}")
+
+    if (start_page is not None and start_page < 1) or (end_page is not None and end_page < (start_page or 1)):
+        raise HTTPException(status_code=400, detail="Invalid page range")
+
+    page_range = [start_page - 1 if start_page else None, end_page]
+    content_key = job.get("base_content_key")
+    if content_key and page_range != [None, None]:
+        # A partial render must not be handed out for uploads of the whole PDF
+        content_key = cache_key(content_key, page_range)
+
+    if job["status"] == "completed" and job.get("content_key") == content_key:
+        # This job already has the video for these pages
+        return JSONResponse({
+            "job_id": job_id,
+            "status": "completed",
+            "video_url": job["video_url"],
+            "message": "Video already cooked!"
+        })
+
+    # Same PDF, pages and settings already rendered? Point this job at those artifacts
+    duplicate = find_completed_duplicate(content_key, exclude_job_id=job_id) if content_key else None
+    if duplicate:
+        original_job_id, original = duplicate
+        job_store.update(
+            job_id,
+            status="completed",
+            stage="completed",
+            progress=100,
+            step="✅ Completed! (already cooked)",
+            page_range=page_range,
+            content_key=content_key,
+            artifact_job_id=original["artifact_job_id"],
+            duplicate_of=original_job_id,
+            video_url=f"/api/video/{job_id}",
+            eta_seconds=0,
+            eta_deadline=None,
+            elapsed_time=0
+        )
+        metrics.JOBS.labels("duplicate").inc()
+        return JSONResponse({
+            "job_id": job_id,
+            "status": "completed",
+            "video_url": f"/api/video/{job_id}",
+            "message": "Already skibidi-fied this exact PDF - your video is ready!"
+        })
+
     # Initialize status
-    processing_status[job_id].update({
-        "status": "queued",
-        "progress": 0,
-        "step": "Starting...",
-        "eta_seconds": 180
-    })
+    job_store.update(
+        job_id,
+        status="queued",
+        stage="queued",
+        progress=0,
+        page_range=page_range,
+        pipeline=pipeline,
+        render_mode=render_mode,
+        profile=PROFILE_BY_DEFAULT if profile is None else profile,
+        content_key=content_key,
+        duplicate_of=None,
+        owner=WORKER_ID,
+        lease_deadline=time.time() + JOB_LEASE_SECONDS,
+        step="Waiting in queue...",
+        eta_deadline=time.time() + estimate_eta_seconds("extract", {"extract": pdf_path.stat().st_size / 1e6})
+    )
 
-    # Start background processing
-    background_tasks.add_task(process_pdf_background, job_id)
+    try:
+        position = scheduler.submit(job_id, process_pdf_background)
+    except QueueFullError:
+        metrics.JOBS.labels("rejected").inc()
+        job_store.update(job_id, status="uploaded", stage=None, step="Queue full - try again shortly")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many videos cooking right now. Try again in a bit.",
+            headers={"Retry-After": "30"}
+        )
 
     return JSONResponse({
         "job_id": job_id,
         "status": "queued",
-        "message": "Processing started! Check /api/status/{job_id} for updates."
+        "queue_position": position,
+        "message": "Processing queued! Check /api/status/{job_id} for updates."
     })
 
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics for this API process"""
+
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/api/queue")
+async def get_queue():
+    """Current queue depth and worker pool usage"""
+
+    return JSONResponse(scheduler.stats())
+
+
 @app.get("/api/status/{job_id}")
 async def get_status(job_id: str):
     """Get processing status for a job"""
 
-    if job_id not in processing_status:
+    job = job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job ID not found")
 
-    return JSONResponse(processing_status[job_id])
+    if is_orphaned(job):
+        job = fail_orphaned_job(job_id) or job
+
+    if job["status"] == "queued":
+        job["queue_position"] = scheduler.queue_position(job_id)
+
+    if job["status"] in ("queued", "processing") and job.get("eta_deadline"):
+        job["eta_seconds"] = max(0, int(job["eta_deadline"] - time.time()))
+
+    return JSONResponse({field: value for field, value in job.items() if field not in INTERNAL_JOB_FIELDS})
+
+
+def parse_byte_range(range_header: str, size: int):
+    """
+    (start, end) inclusive for a single "bytes=" range, None to serve the whole file.
+
+    Raises HTTPException 416 if the range cannot be satisfied. Multi-range
+    requests are answered with the whole file, which RFC 9110 allows.
+    """
+    match = BYTE_RANGE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # "bytes=-N" is the last N bytes
+        start = max(0, size - int(last))
+        end = size - 1
+
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def iter_file_range(path: Path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(RANGE_CHUNK_BYTES, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def artifact_response(request: Request, path: Path, media_type: str, filename: Optional[str] = None,
+                      endpoint: str = "video"):
+    """
+    Serve an immutable job artifact with byte ranges, ETag revalidation and long-lived caching.
+
+    Handles If-None-Match (304), If-Range, single byte ranges (206/416) and HEAD.
+    """
+    stat = path.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": ARTIFACT_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = f'inline; filename="{filename}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    # A stale If-Range means the client's partial copy is outdated: send the whole file
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_byte_range(range_header, stat.st_size)
+
+    if byte_range is None:
+        if request.method == "HEAD":
+            return Response(headers={**headers, "Content-Length": str(stat.st_size)}, media_type=media_type)
+        metrics.BYTES_SERVED.labels(endpoint).inc(stat.st_size)
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=206, headers=headers, media_type=media_type)
+    metrics.BYTES_SERVED.labels(endpoint).inc(length)
+    return StreamingResponse(iter_file_range(path, start, length), status_code=206,
+                             headers=headers, media_type=media_type)
+
+
+@app.api_route("/api/video/{job_id}", methods=["GET", "HEAD"])
+async def get_video(job_id: str, request: Request):
+    """Retrieve the generated video (supports Range, If-None-Match and HEAD)"""
+
+    # Duplicate uploads share the artifacts of the job that rendered them
+    job = job_store.get(job_id)
+    artifact_job_id = (job or {}).get("artifact_job_id") or job_id
+    video_path = OUTPUT_DIR / f"{artifact_job_id}.mp4"
+
+    # Only a finished job's video is immutable - a file still being written is not served
+    if not video_path.exists() or (job and job.get("status") != "completed"):
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    return artifact_response(request, video_path, "video/mp4", filename=f"brainrot_{job_id}.mp4")
 
 
-@app.get("/api/video/{job_id}")
-async def get_video(job_id: str):
-    """Retrieve the generated video"""
+@app.get("/api/profile/{job_id}")
+async def get_profile(job_id: str, format: str = "json"):
+    """
+    Render profile of a profiled job.
 
-    video_path = OUTPUT_DIR / f"{job_id}.mp4"
+    format=json (default) returns the summary: per-frame timing percentiles,
+    caption/reader statistics and the heaviest functions. format=pstats
+    downloads the raw cProfile data (python -m pstats, snakeviz, ...), which
+    is missing if another render held the profiler at the time.
+    """
+
+    if format not in ("json", "pstats"):
+        raise HTTPException(status_code=400, detail="format must be json or pstats")
+
+    # Duplicate uploads share the profile of the job that rendered them
+    job = job_store.get(job_id)
+    artifact_job_id = (job or {}).get("artifact_job_id") or job_id
+    extension = "json" if format == "json" else "prof"
+    profile_path = OUTPUT_DIR / f"{artifact_job_id}_profile.{extension}"
+
+    if not profile_path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "json":
+        return FileResponse(profile_path, media_type="application/json")
+    return FileResponse(profile_path, media_type="application/octet-stream",
+                        filename=f"brainrot_{job_id}_render.prof")
 
-    if not video_path.exists():
-        raise HTTPException(status_code=404, detail="Video not found")
+
+def hls_dir_for(job_id: str) -> Path:
+    return OUTPUT_DIR / f"{job_id}_hls"
+
+
+@app.get("/api/hls/{job_id}/{filename}")
+async def get_hls_file(job_id: str, filename: str, request: Request):
+    """
+    Serve a job's HLS playlist and segments.
+
+    The playlist grows while the video renders (404 until the first segment
+    is written - the job's hls_url appears once it exists), so it is never
+    cached; segments never change once written.
+    """
+
+    if not HLS_FILENAME.match(filename):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    job = job_store.get(job_id)
+    artifact_job_id = (job or {}).get("artifact_job_id") or job_id
+    file_path = hls_dir_for(artifact_job_id) / filename
+
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    extension = filename.rsplit(".", 1)[1]
+    if extension != "m3u8":
+        return artifact_response(request, file_path, HLS_MEDIA_TYPES[extension], endpoint="hls")
+
+    metrics.BYTES_SERVED.labels("hls").inc(file_path.stat().st_size)
 
     return FileResponse(
-        video_path,
-        media_type="video/mp4",
-        filename=f"brainrot_{job_id}.mp4"
+        file_path,
+        media_type=HLS_MEDIA_TYPES[extension],
+        headers={"Cache-Control": "no-cache"}
     )
 
 
@@ -233,21 +856,34 @@ async def get_video(job_id: str):
 async def cleanup(job_id: str):
     """Clean up files for a completed job"""
 
+    # Duplicate uploads have no artifacts of their own - they point at the job that rendered them
+    job = job_store.get(job_id)
+    artifact_job_id = (job or {}).get("artifact_job_id") or job_id
+
     pdf_path = UPLOAD_DIR / f"{job_id}.pdf"
-    video_path = OUTPUT_DIR / f"{job_id}.mp4"
-    audio_path = OUTPUT_DIR / f"{job_id}_audio.mp3"
+    video_path = OUTPUT_DIR / f"{artifact_job_id}.mp4"
+    audio_path = OUTPUT_DIR / f"{artifact_job_id}_audio.mp3"
+
+    # Keep the artifacts while any other job still points at them
+    shared = any(
+        other_id != job_id and (other.get("artifact_job_id") or other_id) == artifact_job_id
+        for other_id, other in job_store.find_by_status("completed")
+    )
 
     # Remove files
     if pdf_path.exists():
         pdf_path.unlink()
-    if video_path.exists():
+    if video_path.exists() and not shared:
         video_path.unlink()
-    if audio_path.exists():
+    if audio_path.exists() and not shared:
         audio_path.unlink()
+    if not shared:
+        shutil.rmtree(hls_dir_for(artifact_job_id), ignore_errors=True)
+        for profile_path in OUTPUT_DIR.glob(f"{artifact_job_id}_profile.*"):
+            profile_path.unlink()
 
     # Remove from status
-    if job_id in processing_status:
-        del processing_status[job_id]
+    job_store.delete(job_id)
 
     return JSONResponse({"message": "Cleanup completed"})
 
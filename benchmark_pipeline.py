@@ -0,0 +1,437 @@
+"""
+Skibidi-fication 3000 - Pipeline benchmark
+==========================================
+Times every pipeline stage offline, without touching OpenAI.
+
+- The Responses and speech endpoints are replaced (via
+  provider_clients.install_client_factory) by deterministic stand-ins:
+  translation returns fixed text sized from the input, and speech returns
+  silent MP3 frames lasting as long as the narration would.
+- Input PDFs are generated on the fly with N pages of text, and the
+  background is a synthetic FFmpeg test pattern (lavfi), so no sample
+  files are needed.
+- The benchmark runs inside a throwaway directory with the default
+  (relative) cache location, like the API does, and clears the caches
+  between runs, so every stage is timed cold.
+- Every render stage checks which renderer actually produced the video: a
+  silent fallback (e.g. FFmpeg -> MoviePy) is reported and fails the run
+  instead of being timed as if it were the fast path.
+- Startup cost is measured as the cold import time of the entry modules,
+  each in a fresh interpreter and scratch directory (reported as the
+  "import" size).
+
+Each stage's median over --repeat runs is written to --output as JSON.
+With --baseline, stages that got slower than the baseline by more than
+--threshold (and --min-delta seconds) are reported and the exit code is 1,
+as it is for render fallbacks.
+
+Usage:
+    python benchmark_pipeline.py --pages 4 32 128 --output bench.json
+    python benchmark_pipeline.py --baseline bench.json --skip-moviepy
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+
+# Silent MPEG-2 Layer III frame: 24 kHz mono, 32 kbps -> 96 bytes, 576 samples (24 ms).
+# All-zero side info decodes as silence, so no encoder is needed.
+SILENT_MP3_FRAME = bytes([0xFF, 0xF3, 0x44, 0xC0]) + bytes(92)
+SILENT_MP3_FRAME_SECONDS = 576 / 24000
+
+# Fixed narration the translation stand-in repeats (sentences keep the caption/TTS splitting realistic)
+STUB_SENTENCES = [
+    "Yo chat, this lecture is lowkey bussin fr fr.",
+    "The main character here is the mitochondria, no cap.",
+    "Skibidi energy but make it academic.",
+    "This concept is giving main quest vibes ngl.",
+    "Sigma students take notes, the rizz is in the details!",
+    "Ohio-level plot twist incoming, stay locked in.",
+]
+
+SOURCE_SENTENCES = [
+    "The cell is the basic structural and functional unit of all known organisms.",
+    "Energy is converted into usable forms through a series of coupled reactions.",
+    "Each experiment was repeated three times and the mean values are reported.",
+    "These results suggest that the proposed model generalizes to unseen data.",
+    "A brief review of the relevant literature is given in the following section.",
+]
+
+
+def stub_text(chars, sentences):
+    """Deterministic text of about chars characters built from sentences."""
+    parts = []
+    length = 0
+    i = 0
+    while length < chars:
+        sentence = sentences[i % len(sentences)]
+        parts.append(sentence)
+        length += len(sentence) + 1
+        i += 1
+    return " ".join(parts)
+
+
+def silent_mp3(seconds):
+    return SILENT_MP3_FRAME * max(1, round(seconds / SILENT_MP3_FRAME_SECONDS))
+
+
+class StubProviders:
+    """Deterministic stand-ins for the OpenAI Responses and speech endpoints."""
+
+    def __init__(self, latency=0.0):
+        from brainrot_turbo import (
+            NARRATION_CHARS_PER_SECOND,
+            SOURCE_CHARS_PER_NARRATION_CHAR,
+            TARGET_NARRATION_SECONDS,
+        )
+
+        self.latency = latency
+        self.chars_per_second = NARRATION_CHARS_PER_SECOND
+        self.max_narration_chars = TARGET_NARRATION_SECONDS * NARRATION_CHARS_PER_SECOND
+        self.compression = SOURCE_CHARS_PER_NARRATION_CHAR
+
+    def translation(self, source):
+        return stub_text(min(self.max_narration_chars, max(200, len(source) // self.compression)), STUB_SENTENCES)
+
+    def client_factory(self, api_key, is_async):
+        stub = self
+
+        class Responses:
+            def create(self, input, stream=False, **kwargs):
+                time.sleep(stub.latency)
+                text = stub.translation(input)
+                if stream:
+                    return iter([SimpleNamespace(type="response.output_text.delta", delta=text[i:i + 40])
+                                 for i in range(0, len(text), 40)])
+                return SimpleNamespace(output_text=text)
+
+        class AsyncResponses:
+            async def create(self, input, **kwargs):
+                await asyncio.sleep(stub.latency)
+                return SimpleNamespace(output_text=stub.translation(input))
+
+        class Speech:
+            def create(self, input, **kwargs):
+                time.sleep(stub.latency)
+                return SimpleNamespace(content=silent_mp3(len(input) / stub.chars_per_second))
+
+        return SimpleNamespace(responses=AsyncResponses() if is_async else Responses(),
+                               audio=SimpleNamespace(speech=Speech()))
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_synthetic_pdf(path, pages, lines_per_page=45):
+    """Write a minimal valid PDF with pages of Helvetica text (a heading every 8 pages)."""
+    objects = []  # Object bodies; object number = index + 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    kids = []
+    for page in range(pages):
+        lines = []
+        if page % 8 == 0:
+            lines.append(f"Chapter {page // 8 + 1}")
+        while len(lines) < lines_per_page:
+            lines.append(SOURCE_SENTENCES[(page + len(lines)) % len(SOURCE_SENTENCES)])
+        content = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        content = content.encode("latin-1")
+        contents = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_obj, font, contents)
+        ))
+
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+
+    with open(path, "wb") as f:
+        f.write(output)
+    return path
+
+
+def write_synthetic_background(path, seconds=10, size="720x1280", fps=30):
+    """A looping-friendly synthetic background clip from FFmpeg's test source."""
+    subprocess.run([
+        'ffmpeg', '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate={fps}', '-t', str(seconds),
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-y', path
+    ], check=True, capture_output=True)
+    return path
+
+
+# Modules a server or render worker process imports before it can do anything
+IMPORT_MODULES = ("brainrot_turbo", "render_worker", "backend_api")
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_import(module, cwd):
+    """
+    Wall time of `import module` in a fresh interpreter running in cwd.
+
+    Raises RuntimeError with the interpreter's last stderr line if the import fails.
+    """
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.getenv("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=cwd, env=env)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {result.returncode}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_imports(repeat, work_dir):
+    """
+    Median cold import time of each of IMPORT_MODULES.
+
+    Imports run in a scratch directory, so the API's import-time side effects
+    (jobs.db, uploads/, outputs/) don't land in the repository; it gets empty
+    frontend/ and meme/ directories for the static mounts.
+    """
+    scratch = os.path.join(work_dir, "import")
+    for directory in ("frontend", "meme"):
+        os.makedirs(os.path.join(scratch, directory), exist_ok=True)
+
+    stages = {}
+    for module in IMPORT_MODULES:
+        try:
+            stages[module] = round(statistics.median(time_import(module, scratch) for _ in range(repeat)), 4)
+        except RuntimeError as e:
+            print(f"⚠️  Could not import {module} ({e}) - skipping its import time")
+    return stages
+
+
+def clear_caches():
+    """Empty every on-disk cache so the next stage run is cold."""
+    from brainrot_cache import CACHE_ROOT
+
+    for name in ("pdf_pages", "translations", "tts"):
+        shutil.rmtree(os.path.join(CACHE_ROOT, name), ignore_errors=True)
+        os.makedirs(os.path.join(CACHE_ROOT, name), exist_ok=True)
+
+
+def time_stage(fn, repeat, setup=None):
+    """Median wall time of fn() over repeat runs (setup() runs untimed before each), plus the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def benchmark_size(pages, work_dir, background, repeat, skip_moviepy):
+    """
+    Time every stage on a synthetic PDF of the given size.
+
+    Returns (inputs, stages, fallbacks), where fallbacks maps render stages
+    whose video came from a different renderer than intended to that renderer.
+    """
+    import brainrot_turbo as bt
+
+    pdf_path = write_synthetic_pdf(os.path.join(work_dir, f"synthetic_{pages}p.pdf"), pages)
+    stages = {}
+
+    stages["extract"], pdf_text = time_stage(
+        lambda: bt.extract_text_from_pdf(pdf_path), repeat, setup=clear_caches)
+    stages["extract_budgeted"], budgeted_text = time_stage(
+        lambda: bt.extract_text_from_pdf(pdf_path, max_chars=bt.source_char_budget()), repeat, setup=clear_caches)
+
+    stages["translate"], brainrot_text = time_stage(
+        lambda: bt.brainrot_translate_turbo(budgeted_text, use_cache=False), repeat)
+
+    audio_path = os.path.join(work_dir, f"narration_{pages}p.mp3")
+    stages["tts"], _ = time_stage(
+        lambda: bt.generate_tts_audio(brainrot_text, audio_path, use_cache=False), repeat)
+    audio_duration = bt.get_audio_duration(audio_path)
+
+    stages["text_chunks"], _ = time_stage(
+        lambda: bt.create_text_chunks(brainrot_text, audio_duration, min_duration_per_chunk=0.8), repeat)
+
+    fallbacks = {}
+    if background:
+        output = os.path.join(work_dir, f"render_{pages}p.mp4")
+        # At least two segments, so small machines still exercise the segment path
+        segments = max(2, bt.RENDER_SEGMENTS)
+        text_chunks = bt.create_text_chunks(brainrot_text, audio_duration, min_duration_per_chunk=0.8)
+        # Timelines too short to split are rendered in one piece by design
+        parallel_path = "parallel" if len(bt.split_timeline(text_chunks, audio_duration, segments)) > 1 else "ffmpeg"
+
+        renders = [
+            ("render_ffmpeg", bt.create_video_with_audio_ffmpeg, {}, "ffmpeg"),
+            ("render_parallel", bt.create_video_with_audio_parallel, {"segments": segments}, parallel_path),
+        ]
+        if not skip_moviepy:
+            renders.append(("render_moviepy", bt.create_video_with_audio, {}, "moviepy"))
+
+        for stage, render, kwargs, expected in renders:
+            def run(render=render, kwargs=kwargs, stage=stage, expected=expected):
+                frame_stats = bt.FrameStats()
+                render(background, audio_path, brainrot_text, output, frame_stats=frame_stats, **kwargs)
+                if frame_stats.render_path != expected:
+                    print(f"⚠️  {stage} fell back to the {frame_stats.render_path} renderer")
+                    fallbacks[stage] = frame_stats.render_path
+
+            stages[stage], _ = time_stage(run, repeat)
+
+    inputs = {
+        "pages": pages,
+        "pdf_chars": len(pdf_text),
+        "budgeted_chars": len(budgeted_text),
+        "narration_chars": len(brainrot_text),
+        "audio_seconds": round(audio_duration, 2),
+    }
+    return inputs, {stage: round(seconds, 4) for stage, seconds in stages.items()}, fallbacks
+
+
+def find_regressions(results, baseline, threshold, min_delta):
+    """[(size, stage, baseline seconds, current seconds), ...] for stages slower than the baseline."""
+    regressions = []
+    for size, current in results["results"].items():
+        previous = baseline.get("results", {}).get(size, {})
+        for stage, seconds in current["stages"].items():
+            before = previous.get("stages", {}).get(stage)
+            if before and seconds > before * (1 + threshold) and seconds - before > min_delta:
+                regressions.append((size, stage, before, seconds))
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stage-level benchmark of the brainrot pipeline")
+    parser.add_argument("--pages", type=int, nargs="+", default=[4, 32, 128], help="Synthetic PDF sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (the median is reported)")
+    parser.add_argument("--provider-latency", type=float, default=0.0,
+                        help="Seconds each stubbed API call sleeps, to model network latency")
+    parser.add_argument("--skip-moviepy", action="store_true", help="Skip the (slow) MoviePy render path")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown ratio before flagging")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="Ignore slowdowns smaller than this (seconds)")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Run where the default relative cache dir (.cache/brainrot) is fresh, so path bugs
+    # that only show with relative paths are caught; set before the pipeline modules load
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="brainrot_bench_")
+    os.chdir(work_dir)
+    os.environ.pop("BRAINROT_CACHE_DIR", None)
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-stub")
+
+    import provider_clients
+    provider_clients.install_client_factory(StubProviders(args.provider_latency).client_factory)
+
+    background = None
+    if shutil.which("ffmpeg"):
+        import brainrot_turbo as bt
+        print("\n[setup] Preparing synthetic background...")
+        background = write_synthetic_background(os.path.join(work_dir, "background.mp4"))
+        started = time.perf_counter()
+        bt.prepare_background(background)
+        prepare_seconds = time.perf_counter() - started
+    else:
+        print("⚠️  ffmpeg not found - skipping render stages")
+        prepare_seconds = None
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "provider_latency": args.provider_latency,
+            "prepare_background_seconds": round(prepare_seconds, 4) if prepare_seconds is not None else None,
+        },
+        "results": {},
+    }
+
+    try:
+        print("\n[bench] Cold imports...")
+        results["results"]["import"] = {"inputs": {}, "stages": benchmark_imports(args.repeat, work_dir)}
+        for pages in args.pages:
+            print(f"\n[bench] {pages} pages...")
+            inputs, stages, fallbacks = benchmark_size(pages, work_dir, background, args.repeat, args.skip_moviepy)
+            results["results"][f"{pages}p"] = {"inputs": inputs, "stages": stages, "fallbacks": fallbacks}
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("\n" + "=" * 60)
+    for size, result in results["results"].items():
+        print(f"{size}: " + ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in result["stages"].items()))
+    print(f"Results written to {args.output}")
+
+    failed = False
+    fallbacks = [(size, stage, renderer) for size, result in results["results"].items()
+                 for stage, renderer in result.get("fallbacks", {}).items()]
+    if fallbacks:
+        print(f"\n❌ {len(fallbacks)} render stage(s) fell back to another renderer:")
+        for size, stage, renderer in fallbacks:
+            print(f"  {size} {stage}: rendered by {renderer}")
+        failed = True
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n🐢 {len(regressions)} stage(s) slower than {args.baseline}:")
+            for size, stage, before, after in regressions:
+                print(f"  {size} {stage}: {before:.3f}s -> {after:.3f}s ({(after / before - 1) * 100:+.0f}%)")
+            failed = True
+        else:
+            print(f"\n✅ No regressions against {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
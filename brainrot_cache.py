@@ -0,0 +1,161 @@
+"""
+Skibidi-fication 3000 - On-disk caches
+======================================
+Content-addressed byte caches shared by the pipeline stages.
+
+Each cache is a directory of files named after the SHA-256 of their key.
+Writes are atomic (temp file + rename), so several API workers can share
+one cache directory. Eviction is size-based LRU: reads bump a file's mtime
+and the oldest files are dropped once the directory exceeds max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+CACHE_ROOT = os.getenv("BRAINROT_CACHE_DIR", os.path.join(".cache", "brainrot"))
+
+
+def cache_key(*parts):
+    """Hash arbitrary JSON-serializable parts into a stable hex key."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Size-bounded LRU byte cache stored under CACHE_ROOT/<name>."""
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.directory = os.path.join(CACHE_ROOT, name)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = None  # Computed lazily from the directory listing
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small on big caches
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the cached bytes for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def get_text(self, key):
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def set(self, key, data):
+        """Store bytes under key, evicting least recently used entries if needed."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            replaced = os.stat(path).st_size  # Overwriting an entry frees its old size
+        except FileNotFoundError:
+            replaced = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def set_text(self, key, text):
+        self.set(key, text.encode("utf-8"))
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if filename.startswith(".tmp-"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted by another worker
+                yield path, stat
+
+    def _scan_size(self):
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries until we are under 90% of max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(stat.st_size for _, stat in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for path, stat in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+
+        self._size = size
+
+    def stats(self):
+        """Hit/miss counters for this process."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name, max_bytes):
+    """Return the process-wide DiskCache for name, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = DiskCache(name, max_bytes)
+            _caches[name] = cache
+        return cache
+
+
+def all_cache_stats():
+    """Hit/miss counters for every cache opened in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
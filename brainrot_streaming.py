@@ -0,0 +1,236 @@
+"""
+Skibidi-fication 3000 - Streaming pipeline
+==========================================
+Overlapped translate -> TTS -> render.
+
+The staged pipeline (generate_brainrot_turbo) waits for each stage to
+finish before the next one starts. Here the stages overlap:
+
+1. The Responses API output is streamed and cut into sentence groups as
+   soon as each group is complete.
+2. Each group is sent to TTS right away (the TTS cache still applies).
+3. As soon as a group's audio and all earlier groups are ready, the group
+   is rendered into a video-only segment with its captions burned in.
+4. At the end the segments are joined by stream copy (concat demuxer) and
+   muxed with the narration, which is the only encode left.
+
+Time-to-video therefore approaches the duration of the slowest stage
+rather than the sum of all of them. If segment rendering fails, the
+narration is still completed and the whole video is rendered with the
+staged FFmpeg/MoviePy path instead.
+"""
+
+import os
+import queue
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from brainrot_turbo import (
+    BRAINROT_INSTRUCTIONS,
+    NARRATION_CHARS_PER_SECOND,
+    TARGET_NARRATION_SECONDS,
+    TRANSLATE_MODEL,
+    TRANSLATE_REASONING,
+    TTS_MAX_CONCURRENCY,
+    concat_segments,
+    create_text_chunks,
+    create_video_with_audio_ffmpeg,
+    estimate_request_tokens,
+    extract_text_from_pdf,
+    get_translation_cache,
+    join_audio,
+    mp3_duration,
+    prepare_background,
+    render_video_segment,
+    source_char_budget,
+    synthesize_narration,
+    translation_cache_key,
+)
+from provider_clients import call_provider, get_openai_client
+
+
+# Narration is dispatched to TTS in groups of at least this many characters (~20 seconds)
+MIN_GROUP_CHARS = 300
+
+# A sentence ends at . ! or ? (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+
+def _pop_groups(buffer, min_chars):
+    """Cut complete sentence groups of at least min_chars off the front of buffer."""
+    groups = []
+    while True:
+        match = next((m for m in SENTENCE_END.finditer(buffer) if m.end() >= min_chars), None)
+        if match is None:
+            return groups, buffer
+        groups.append(buffer[:match.end()].strip())
+        buffer = buffer[match.end():]
+
+
+def stream_translation_groups(text, api_key=None, min_group_chars=MIN_GROUP_CHARS):
+    """
+    Yield the brainrot translation of text in sentence groups as it streams in.
+
+    Served from the translation cache when possible; otherwise the full
+    streamed translation is cached once the stream completes.
+    """
+    cache = get_translation_cache()
+    key = translation_cache_key(text, "single")
+    cached = cache.get_text(key)
+    if cached is not None:
+        print("  > Translation cache hit - skipping GPT-5-nano")
+        groups, rest = _pop_groups(cached + " ", min_group_chars)
+        yield from groups
+        if re.search(r'\w', rest):
+            yield rest.strip()
+        return
+
+    client = get_openai_client(api_key)
+    print("  > Streaming GPT-5-nano translation...")
+
+    # Retries only cover opening the stream - a stream that breaks midway fails the job
+    stream = call_provider(
+        "responses",
+        client.responses.create,
+        tokens=estimate_request_tokens(BRAINROT_INSTRUCTIONS, text, TARGET_NARRATION_SECONDS * NARRATION_CHARS_PER_SECOND),
+        model=TRANSLATE_MODEL,
+        reasoning=TRANSLATE_REASONING,
+        instructions=BRAINROT_INSTRUCTIONS,
+        input=text,
+        stream=True
+    )
+
+    parts = []
+    buffer = ""
+    for event in stream:
+        if event.type == "response.output_text.delta":
+            parts.append(event.delta)
+            buffer += event.delta
+            groups, buffer = _pop_groups(buffer, min_group_chars)
+            yield from groups
+
+    if re.search(r'\w', buffer):
+        yield buffer.strip()
+
+    full_text = "".join(parts)
+    if full_text:
+        cache.set_text(key, full_text)
+
+
+def synthesize_group(text, openai_api_key=None):
+    """TTS one sentence group; returns (mp3 bytes, duration in seconds)."""
+    # Groups are already synthesized in parallel, so keep per-group fan-out small
+    audio = join_audio(synthesize_narration(text, openai_api_key, max_concurrency=2))
+    return audio, mp3_duration(audio)
+
+
+def generate_brainrot_streaming(pdf_path, background_video="subway.mp4", output_video="output.mp4",
+                                openai_api_key=None, page_range=None, target_seconds=TARGET_NARRATION_SECONDS,
+                                file_hash=None, audio_path=None, run_render=None, progress_callback=None):
+    """
+    STREAMING MODE: same output as generate_brainrot_turbo with the stages overlapped.
+
+    Args:
+        pdf_path, background_video, output_video, openai_api_key, page_range,
+        target_seconds: as for generate_brainrot_turbo
+        file_hash: SHA-256 of the PDF if already known
+        audio_path: Where to keep the full narration (default: next to output_video)
+        run_render: Optional callable(fn, *args) used to run each segment render,
+            e.g. a scheduler's render pool. Defaults to calling fn directly.
+        progress_callback: Optional callable(progress_percent, step)
+
+    Returns:
+        Dict with output_path, audio_path, brainrot_text, audio_duration, pdf_chars
+        and render_path ("segments", or "fallback" if the segments failed and
+        the whole video was rendered at the end)
+    """
+    run_render = run_render or (lambda fn, *args: fn(*args))
+    report = progress_callback or (lambda progress, step: None)
+    audio_path = audio_path or os.path.splitext(output_video)[0] + "_audio.mp3"
+
+    print("SKIBIDI-FICATION 3000 - STREAMING MODE ACTIVATED")
+    print("=" * 60)
+
+    print("\n[1/2] Extracting text from PDF...")
+    report(5, "📄 Extracting text from PDF...")
+    pdf_text = extract_text_from_pdf(pdf_path, file_hash=file_hash, page_range=page_range,
+                                     max_chars=source_char_budget(target_seconds))
+    print(f"  > Extracted {len(pdf_text)} characters from PDF")
+
+    print("\n[2/2] Streaming translate -> TTS -> render...")
+    report(15, "🔥 Cooking brainrot (translate + voice + video all at once)...")
+    prepared_background, background = prepare_background(background_video)
+
+    with tempfile.TemporaryDirectory(prefix="brainrot_stream_") as work_dir:
+        pending = queue.Queue()  # (group text, TTS future) in narration order, None when done
+        result = {"segments": [], "audio": [], "texts": [], "duration": 0.0, "render_error": None, "error": None}
+
+        def render_loop():
+            """Render each group as soon as its audio (and every earlier group's) is ready."""
+            while (item := pending.get()) is not None:
+                text, future = item
+                if result["error"] is not None:
+                    continue  # Narration already failed - just drain the queue
+                try:
+                    audio, duration = future.result()
+                except Exception as e:
+                    result["error"] = e
+                    continue
+                start_time = result["duration"]
+                result["audio"].append(audio)
+                result["texts"].append(text)
+                result["duration"] += duration
+
+                if result["render_error"] is not None:
+                    continue  # Keep collecting narration for the staged fallback
+                segment_path = os.path.join(work_dir, f"segment_{len(result['segments']):04d}.mp4")
+                text_chunks = create_text_chunks(text, duration, min_duration_per_chunk=0.8)
+                try:
+                    run_render(render_video_segment, prepared_background, background, text_chunks,
+                               start_time, result["duration"], segment_path)
+                    result["segments"].append(segment_path)
+                    progress = min(95, 15 + int(80 * result["duration"] / target_seconds))
+                    report(progress, f"🎬 Rendered {result['duration']:.0f}s of video...")
+                except Exception as e:
+                    print(f"  > Segment render failed ({e}) - will render the whole video at the end")
+                    result["render_error"] = e
+
+        with ThreadPoolExecutor(max_workers=max(1, TTS_MAX_CONCURRENCY // 2)) as tts_pool:
+            renderer = threading.Thread(target=render_loop, name="brainrot-stream-render")
+            renderer.start()
+            try:
+                for group in stream_translation_groups(pdf_text, openai_api_key):
+                    pending.put((group, tts_pool.submit(synthesize_group, group, openai_api_key)))
+            finally:
+                pending.put(None)
+                renderer.join()
+
+        if result["error"] is not None:
+            raise result["error"]
+        if not result["audio"]:
+            raise ValueError("Translation produced no narration.")
+
+        brainrot_text = " ".join(result["texts"])
+        with open(audio_path, "wb") as f:
+            f.write(join_audio(result["audio"]))
+
+        report(96, "🎬 Finalizing video...")
+        if result["render_error"] is None:
+            concat_segments(result["segments"], audio_path, output_video, work_dir)
+        else:
+            create_video_with_audio_ffmpeg(background_video, audio_path, brainrot_text, output_video)
+
+    print("\n" + "=" * 60)
+    print(f"SUCCESS! BRAINROT VIDEO GENERATED: {output_video}")
+    print("=" * 60)
+
+    return {
+        "output_path": output_video,
+        "audio_path": audio_path,
+        "brainrot_text": brainrot_text,
+        "audio_duration": result["duration"],
+        "pdf_chars": len(pdf_text),
+        "render_path": "segments" if result["render_error"] is None else "fallback",
+    }
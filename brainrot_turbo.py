@@ -8,53 +8,240 @@ This is the turbo version optimized for speed using OpenAI's fastest model.
 
 Technical Stack:
 - GPT-5-nano: Ultra-fast Gen Z translation (0.05/1M tokens input, 0.40/1M output)
-- ElevenLabs API: Adam voice (the iconic Reddit stories voice)
-- MoviePy: Video composition with procedural gameplay sync
+- OpenAI TTS: 'echo' voice, synthesized in groups of sentences in parallel
+- FFmpeg (MoviePy fallback): Video composition with procedural gameplay sync
+
+Heavy dependencies (numpy, PIL, PyPDF2, MoviePy) are imported where they are
+used, so importing this module (and starting the API) stays fast.
 """
 
 import os
 import re
-import numpy as np
-from PyPDF2 import PdfReader
-from PIL import Image, ImageDraw, ImageFont
-try:
-    from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip
-except ImportError:
-    from moviepy import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip
-from openai import OpenAI
-from elevenlabs import ElevenLabs
-
-
-def extract_text_from_pdf(pdf_path):
-    """Extract all text content from a PDF file."""
+import threading
+from bisect import bisect_right
+from time import perf_counter
+from collections import namedtuple
+from functools import lru_cache
+from brainrot_cache import CACHE_ROOT, cache_key, get_cache
+import mp3_frames
+from media_probe import probe_media
+from provider_clients import acall_provider, call_provider, get_async_openai_client, get_openai_client, run_async
+
+
+# Page text is cached by file hash + page index, so re-processing a PDF skips parsing
+PDF_PAGE_CACHE_MAX_BYTES = int(os.getenv("BRAINROT_PDF_CACHE_MB", "256")) * 1024 * 1024
+
+# Large PDFs are parsed across a process pool in page ranges of this size
+PDF_EXTRACT_WORKERS = int(os.getenv("BRAINROT_PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = 16
+PDF_PARALLEL_MIN_PAGES = 32
+
+
+def get_pdf_page_cache():
+    """Process-wide cache of extracted page text keyed by file hash and page index."""
+    return get_cache("pdf_pages", PDF_PAGE_CACHE_MAX_BYTES)
+
+
+def pdf_page_cache_key(file_hash, page_index):
+    return cache_key("pdf_page", file_hash, page_index)
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks."""
+    import hashlib
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """Process-wide pool that parses PDF page ranges, started on first use and kept for later PDFs."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn, not fork: this may run on a worker thread of the API process
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool):
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(pdf_path, start, stop):
+    """Worker: extract text for pages [start, stop). Pages without text come back as ''."""
+    from PyPDF2 import PdfReader
+
     reader = PdfReader(pdf_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text.strip()
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
 
 
-def brainrot_translate_turbo(text, api_key=None):
+def extract_pdf_pages(pdf_path, page_indices, file_hash=None, reader=None):
     """
-    ULTRA-FAST Gen Z brainrot translation using GPT-5-nano.
+    Extract text for the given pages, in order.
 
-    Prompt Engineering for "Skibidi-fication 3000":
-    - Translates academic concepts into "Rot Speak"
-    - Optimized for viral TikTok/YouTube Shorts format
-    - Maintains educational integrity while maximizing engagement
+    Cached pages are served from the page cache. Missing pages are parsed
+    in-process for small batches, or across the shared process pool (see
+    get_pdf_pool) in contiguous ranges of PDF_PAGES_PER_TASK when there are
+    at least PDF_PARALLEL_MIN_PAGES of them.
+    """
+    page_indices = list(page_indices)
+    file_hash = file_hash or file_sha256(pdf_path)
+    cache = get_pdf_page_cache()
+
+    texts = {}
+    for i in page_indices:
+        cached = cache.get_text(pdf_page_cache_key(file_hash, i))
+        if cached is not None:
+            texts[i] = cached
+
+    missing = [i for i in page_indices if i not in texts]
+    parsed = set()
+
+    if PDF_EXTRACT_WORKERS > 1 and len(missing) >= PDF_PARALLEL_MIN_PAGES:
+        from concurrent.futures.process import BrokenProcessPool
+
+        # Contiguous runs of missing pages, split into tasks of at most PDF_PAGES_PER_TASK
+        ranges = []
+        for i in missing:
+            if ranges and ranges[-1][1] == i and ranges[-1][1] - ranges[-1][0] < PDF_PAGES_PER_TASK:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
 
-    Speed: GPT-5-nano is the fastest OpenAI model (~2-3x faster than GPT-4)
-    Cost: $0.05/1M input, $0.40/1M output (cheapest in GPT-5 family)
+        pool = get_pdf_pool()
+        try:
+            futures = [pool.submit(_extract_page_range, pdf_path, start, stop) for start, stop in ranges]
+            for (start, stop), future in zip(ranges, futures):
+                texts.update(zip(range(start, stop), future.result()))
+                parsed.update(range(start, stop))
+        except BrokenProcessPool as e:
+            print(f"  > PDF worker pool broke ({e}), parsing the remaining pages in-process...")
+            _discard_pdf_pool(pool)
+
+    if len(parsed) < len(missing):
+        from PyPDF2 import PdfReader
+
+        reader = reader or PdfReader(pdf_path)
+        for i in missing:
+            if i not in parsed:
+                texts[i] = reader.pages[i].extract_text() or ""
+
+    for i in missing:
+        cache.set_text(pdf_page_cache_key(file_hash, i), texts[i])
+
+    return [texts[i] for i in page_indices]
+
+
+# The prompt caps narration at 3-5 minutes, so there is no point parsing or
+# sending more source text than that much narration can cover
+TARGET_NARRATION_SECONDS = int(os.getenv("BRAINROT_TARGET_SECONDS", "300"))
+NARRATION_CHARS_PER_SECOND = 15  # 'echo' at speed 1.1
+SOURCE_CHARS_PER_NARRATION_CHAR = 8  # How much lecture text one narrated character can summarize
+CHARS_PER_TOKEN = 4  # Rough English average for OpenAI tokenizers
+
+
+def source_char_budget(target_seconds=TARGET_NARRATION_SECONDS):
+    """Max characters of PDF text worth extracting for a video of target_seconds."""
+    return int(target_seconds * NARRATION_CHARS_PER_SECOND * SOURCE_CHARS_PER_NARRATION_CHAR)
+
+
+def iter_pdf_pages(pdf_path, page_range=None, file_hash=None, first_batch=4):
     """
-    # Initialize OpenAI client
-    if api_key:
-        client = OpenAI(api_key=api_key)
-    else:
-        client = OpenAI()  # Uses OPENAI_API_KEY environment variable
+    Lazily yield (page_index, text) for a PDF.
+
+    page_range is (start, stop) with 0-based indices and stop exclusive;
+    either end may be None. Pages are extracted in batches that start at
+    first_batch pages and double up to a full process-pool round, so a
+    consumer that stops early only pays for roughly the pages it read.
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(pdf_path)
+    file_hash = file_hash or file_sha256(pdf_path)
+
+    start, stop = page_range or (None, None)
+    start, stop, _ = slice(start, stop).indices(len(reader.pages))
+
+    batch_size = first_batch
+    max_batch = max(first_batch, PDF_EXTRACT_WORKERS * PDF_PAGES_PER_TASK)
+    index = start
+    while index < stop:
+        batch = range(index, min(index + batch_size, stop))
+        for page_index, text in zip(batch, extract_pdf_pages(pdf_path, batch, file_hash=file_hash, reader=reader)):
+            yield page_index, text
+        index = batch.stop
+        batch_size = min(batch_size * 2, max_batch)
+
+
+def extract_text_from_pdf(pdf_path, file_hash=None, page_range=None, max_chars=None, max_tokens=None):
+    """
+    Extract text content from a PDF file.
+
+    Pages are parsed in parallel for large PDFs and cached by file hash, so
+    re-processing the same PDF skips parsing. Pass file_hash if the SHA-256
+    of the file is already known (e.g. computed during upload).
 
-    # HACK&ROLL 2026 WINNING PROMPT
-    # This prompt is engineered to create "educational brainrot" that judges will love
-    instructions = """You are the "Skibidi-fication 3000" - an AI that translates boring academic content
+    page_range limits extraction to (start, stop) 0-based pages. max_chars
+    (or max_tokens, converted at ~4 chars/token) stops extraction as soon as
+    the budget is reached, so huge PDFs cost no more than the budget to parse.
+    """
+    if max_chars is None and max_tokens is not None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+
+    if max_chars is None:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(pdf_path)
+        start, stop = page_range or (None, None)
+        indices = range(*slice(start, stop).indices(len(reader.pages)))
+        pages = extract_pdf_pages(pdf_path, indices, file_hash=file_hash, reader=reader)
+        return "\n".join(pages).strip()
+
+    pages = []
+    total = 0
+    for page_index, text in iter_pdf_pages(pdf_path, page_range, file_hash=file_hash):
+        # total counts the joining newlines, so a budget filled exactly leaves remaining at -1
+        remaining = max_chars - total
+        if len(text) > remaining:
+            if remaining > 0:
+                # Cut at a word boundary rather than mid-word
+                cut = text.rfind(" ", 0, remaining)
+                pages.append(text[:cut if cut > 0 else remaining])
+            print(f"  > Stopped at page {page_index + 1}: {max_chars} character budget reached")
+            break
+        pages.append(text)
+        total += len(text) + 1  # +1 for the joining newline
+
+    return "\n".join(pages).strip()
+
+
+# GPT-5-nano settings for the translation stage
+TRANSLATE_MODEL = "gpt-5-nano"
+TRANSLATE_REASONING = {"effort": "low"}  # Fast reasoning for speed
+
+# Repeat uploads of the same lecture notes are served from this cache
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("BRAINROT_TRANSLATION_CACHE_MB", "256")) * 1024 * 1024
+
+# HACK&ROLL 2026 WINNING PROMPT
+# This prompt is engineered to create "educational brainrot" that judges will love
+BRAINROT_INSTRUCTIONS = """You are the "Skibidi-fication 3000" - an AI that translates boring academic content
 into viral Gen Z "brainrot" while keeping it educational.
 
 YOUR MISSION: Transform lecture notes into content that can compete with Subway Surfers for attention.
@@ -101,96 +288,421 @@ TONE: Enthusiastic robot who just discovered Gen Z slang but is genuinely excite
 
 OUTPUT: Pure translated text. No meta-commentary. Just the brainrot lecture. DURATION LIMIT: KEEP TO 3-5mins MAXIMUM"""
 
-    print(f"  > Using GPT-5-nano (TURBO MODE - fastest OpenAI model)")
 
-    # Use the Responses API for maximum speed
-    response = client.responses.create(
-        model="gpt-5-nano",
-        reasoning={"effort": "low"},  # Fast reasoning for speed
-        instructions=instructions,
-        input=text
+def pipeline_settings_key():
+    """Hash of every setting that changes the output for a given PDF (used for duplicate detection)."""
+    return cache_key("pipeline", BRAINROT_INSTRUCTIONS, TRANSLATE_MODEL, TRANSLATE_REASONING,
+                     TTS_MODEL, TTS_VOICE, TTS_SPEED, TARGET_NARRATION_SECONDS)
+
+
+def get_translation_cache():
+    """Process-wide cache of translations keyed by input text, prompt and model settings."""
+    return get_cache("translations", TRANSLATION_CACHE_MAX_BYTES)
+
+
+# Long documents are translated as concurrent sections instead of one big request
+SECTIONED_MIN_CHARS = 12000
+SECTION_MAX_TOKENS = 2500
+TRANSLATE_MAX_CONCURRENCY = int(os.getenv("BRAINROT_TRANSLATE_CONCURRENCY", "8"))
+
+# Lines that look like headings start a new section block
+HEADING_PATTERN = re.compile(
+    r'^\s*(?:\d+(?:\.\d+)*\.?\s+\S.{0,80}|(?i:chapter|section|lecture|part|topic)\b.{0,80}|[A-Z][A-Z0-9 ,:&/()-]{3,80})\s*$'
+)
+
+
+def translation_cache_key(text, mode="single"):
+    # Sections are cut at SECTION_MAX_TOKENS and share a word budget set by the target length
+    sectioning = (SECTION_MAX_TOKENS, TARGET_NARRATION_SECONDS) if mode == "sectioned" else None
+    return cache_key("translate", text, BRAINROT_INSTRUCTIONS, TRANSLATE_MODEL, TRANSLATE_REASONING,
+                     mode, sectioning)
+
+
+def split_into_sections(text, max_tokens=SECTION_MAX_TOKENS):
+    """
+    Split document text into token-bounded sections in document order.
+
+    The text is cut into blocks at heading-like lines (numbered headings,
+    "Chapter ...", ALL CAPS titles), and blocks are packed greedily into
+    sections of at most max_tokens (~4 chars/token). Blocks larger than that
+    are split at line boundaries.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+
+    blocks = [[]]
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and blocks[-1]:
+            blocks.append([])
+        blocks[-1].append(line)
+
+    sections = []
+    current = []
+    current_len = 0
+    for block in blocks:
+        block_text = "\n".join(block)
+        if current and current_len + len(block_text) + 1 > max_chars:
+            sections.append("\n".join(current))
+            current, current_len = [], 0
+
+        if len(block_text) <= max_chars:
+            current.append(block_text)
+            current_len += len(block_text) + 1
+            continue
+
+        # Oversized block: fall back to line boundaries
+        for line in block:
+            if current and current_len + len(line) + 1 > max_chars:
+                sections.append("\n".join(current))
+                current, current_len = [], 0
+            current.append(line)
+            current_len += len(line) + 1
+
+    if current:
+        sections.append("\n".join(current))
+
+    return [section.strip() for section in sections if section.strip()]
+
+
+def _section_instructions(index, count, target_words):
+    """BRAINROT_INSTRUCTIONS plus where this section sits in the video and its length budget."""
+    position = []
+    if index == 0:
+        position.append("Open the video with a hook.")
+    else:
+        position.append("Continue straight on from the previous part - do not re-introduce the video.")
+    if index == count - 1:
+        position.append("Wrap up the video at the end of this part.")
+    else:
+        position.append("Do not wrap up the video - end this part with an engagement hook.")
+
+    return (
+        f"{BRAINROT_INSTRUCTIONS}\n\n"
+        f"SECTION MODE: You are translating part {index + 1} of {count} of one lecture. "
+        f"{' '.join(position)} "
+        f"This part gets about {target_words} words of the video (this replaces the duration limit above)."
     )
 
-    return response.output_text
 
+def estimate_request_tokens(instructions, text, output_chars):
+    """Rough token cost of a translation request, for the provider TPM budget."""
+    return (len(instructions) + len(text) + output_chars) // CHARS_PER_TOKEN
+
+
+async def _translate_sections_async(api_key, sections, target_words, max_concurrency):
+    import asyncio
 
-def generate_tts_audio(text, output_audio_path="brainrot_audio.mp3", elevenlabs_api_key=None, openai_api_key=None):
+    # One pooled client per event loop - every section shares its connections
+    client = get_async_openai_client(api_key)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def translate_section(index, section):
+        instructions = _section_instructions(index, len(sections), target_words[index])
+        async with semaphore:
+            response = await acall_provider(
+                "responses",
+                client.responses.create,
+                tokens=estimate_request_tokens(instructions, section, target_words[index] * 6),
+                model=TRANSLATE_MODEL,
+                reasoning=TRANSLATE_REASONING,
+                instructions=instructions,
+                input=section
+            )
+            return response.output_text
+
+    return await asyncio.gather(*(translate_section(i, section) for i, section in enumerate(sections)))
+
+
+def brainrot_translate_sectioned(text, api_key=None, max_concurrency=None):
     """
-    Generate audio from text using OpenAI TTS API (faster and more reliable).
-    Uses 'echo' voice which is energetic and perfect for brainrot content.
-    Handles texts longer than 4096 characters by chunking and merging.
+    Map-reduce translation for long documents.
+
+    The text is split into token-bounded sections on heading boundaries,
+    every section is translated concurrently with the async OpenAI client,
+    and the outputs are joined in document order. Each section gets a share
+    of the narration word budget proportional to its length, so wall time is
+    set by the slowest section rather than the document size.
     """
-    from openai import OpenAI
-    from pydub import AudioSegment
+    sections = split_into_sections(text)
+    if len(sections) <= 1:
+        return brainrot_translate_turbo(text, api_key, use_cache=False, mode="single")
 
-    # Initialize OpenAI client with explicit API key
-    api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable or pass openai_api_key parameter.")
+    # ~5.5 characters per spoken word including the space
+    total_words = TARGET_NARRATION_SECONDS * NARRATION_CHARS_PER_SECOND / 5.5
+    total_chars = sum(len(section) for section in sections)
+    target_words = [max(60, int(total_words * len(section) / total_chars)) for section in sections]
 
-    client = OpenAI(api_key=api_key)
+    max_concurrency = max_concurrency or TRANSLATE_MAX_CONCURRENCY
+    print(f"  > Translating {len(sections)} sections concurrently ({min(max_concurrency, len(sections))} at a time)")
 
-    print(f"  > Using OpenAI TTS 'echo' voice (optimized for brainrot content)")
+    # On the shared provider loop, so the async client (and its connections) outlive this call
+    outputs = run_async(_translate_sections_async(api_key, sections, target_words, max_concurrency))
+    return "\n\n".join(output.strip() for output in outputs if output and output.strip())
 
-    # OpenAI TTS has a 4096 character limit, so we need to chunk if text is longer
-    MAX_CHARS = 4000  # Leave some buffer
 
-    if len(text) <= MAX_CHARS:
-        # Text fits in one request
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice="echo",
-            input=text,
-            speed=1.1
-        )
-        response.stream_to_file(output_audio_path)
+def brainrot_translate_turbo(text, api_key=None, use_cache=True, mode="auto"):
+    """
+    ULTRA-FAST Gen Z brainrot translation using GPT-5-nano.
+
+    Prompt Engineering for "Skibidi-fication 3000":
+    - Translates academic concepts into "Rot Speak"
+    - Optimized for viral TikTok/YouTube Shorts format
+    - Maintains educational integrity while maximizing engagement
+
+    Speed: GPT-5-nano is the fastest OpenAI model (~2-3x faster than GPT-4)
+    Cost: $0.05/1M input, $0.40/1M output (cheapest in GPT-5 family)
+
+    mode is "single" (one request), "sectioned" (brainrot_translate_sectioned)
+    or "auto", which sections documents longer than SECTIONED_MIN_CHARS.
+
+    Results are cached on disk by a hash of the text, prompt and model
+    settings, so re-uploads of the same PDF skip the LLM call entirely.
+    """
+    if mode == "auto":
+        mode = "sectioned" if len(text) > SECTIONED_MIN_CHARS else "single"
+
+    if use_cache:
+        cache = get_translation_cache()
+        key = translation_cache_key(text, mode)
+        cached = cache.get_text(key)
+        if cached is not None:
+            print("  > Translation cache hit - skipping GPT-5-nano")
+            return cached
+
+    if mode == "sectioned":
+        output_text = brainrot_translate_sectioned(text, api_key)
     else:
-        # Split text into chunks at sentence boundaries
-        print(f"  > Text is {len(text)} chars, splitting into chunks...")
-        sentences = text.replace('!', '.').replace('?', '.').split('.')
+        # Shared pooled client (falls back to OPENAI_API_KEY)
+        client = get_openai_client(api_key)
+
+        print(f"  > Using GPT-5-nano (TURBO MODE - fastest OpenAI model)")
+
+        # Use the Responses API for maximum speed
+        response = call_provider(
+            "responses",
+            client.responses.create,
+            tokens=estimate_request_tokens(BRAINROT_INSTRUCTIONS, text,
+                                           TARGET_NARRATION_SECONDS * NARRATION_CHARS_PER_SECOND),
+            model=TRANSLATE_MODEL,
+            reasoning=TRANSLATE_REASONING,
+            instructions=BRAINROT_INSTRUCTIONS,
+            input=text
+        )
+        output_text = response.output_text
 
-        chunks = []
-        current_chunk = ""
+    if use_cache and output_text:
+        cache.set_text(key, output_text)
 
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
+    return output_text
 
-            if len(current_chunk) + len(sentence) + 1 < MAX_CHARS:
-                current_chunk += sentence + ". "
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + ". "
-
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-
-        print(f"  > Generating {len(chunks)} audio chunks...")
-
-        # Generate audio for each chunk
-        audio_segments = []
-        for i, chunk in enumerate(chunks):
-            temp_file = f"temp_chunk_{i}.mp3"
-            response = client.audio.speech.create(
-                model="tts-1",
-                voice="echo",
-                input=chunk,
-                speed=1.1
-            )
-            response.stream_to_file(temp_file)
-            audio_segments.append(AudioSegment.from_mp3(temp_file))
-            os.remove(temp_file)
 
-        # Concatenate all audio segments
-        print(f"  > Merging {len(audio_segments)} audio segments...")
-        combined = audio_segments[0]
-        for segment in audio_segments[1:]:
-            combined += segment
+# OpenAI TTS settings shared by every narration request
+TTS_MODEL = "tts-1"
+TTS_VOICE = "echo"
+TTS_SPEED = 1.1
+
+# OpenAI TTS has a 4096 character limit, so we need to chunk if text is longer
+TTS_MAX_CHARS = 4000  # Leave some buffer
+
+# How many TTS requests may be in flight at once for a single narration
+TTS_MAX_CONCURRENCY = int(os.getenv("BRAINROT_TTS_CONCURRENCY", "8"))
+
+# Narration is synthesized (and cached) in runs of whole sentences up to this long:
+# a few requests per narration, and the voice only restarts between runs
+TTS_SEGMENT_CHARS = int(os.getenv("BRAINROT_TTS_SEGMENT_CHARS", "500"))
+
+# Synthesized segments are reused across jobs and re-renders
+TTS_CACHE_MAX_BYTES = int(os.getenv("BRAINROT_TTS_CACHE_MB", "1024")) * 1024 * 1024
+
+
+def get_tts_cache():
+    """Process-wide cache of synthesized segments keyed by text, model, voice and speed."""
+    return get_cache("tts", TTS_CACHE_MAX_BYTES)
+
+
+def normalize_tts_text(text):
+    """Collapse whitespace so trivially different segments share a cache entry."""
+    return " ".join(text.split())
+
+
+def tts_cache_key(text):
+    return cache_key("tts", normalize_tts_text(text), TTS_MODEL, TTS_VOICE, TTS_SPEED, "mp3")
+
+
+def split_tts_segments(text, max_chars=TTS_MAX_CHARS, target_chars=TTS_SEGMENT_CHARS):
+    """
+    Split narration into segments of whole sentences for synthesis and caching.
+
+    Consecutive sentences are packed into segments of up to target_chars.
+    Sentences end at . ! or ? followed by whitespace, so numbers like 3.14
+    stay intact. Sentences longer than max_chars are broken at word boundaries.
+    """
+    segments = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        sentence = normalize_tts_text(sentence)
+        if not re.search(r'\w', sentence):
+            continue  # Nothing speakable (stray punctuation, empty lines)
+
+        if current and len(current) + 1 + len(sentence) <= target_chars:
+            current += " " + sentence
+            continue
+        if current:
+            segments.append(current)
+
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            segments.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        current = sentence
+
+    if current:
+        segments.append(current)
+
+    return segments
+
+
+def synthesize_speech(client, text):
+    """Run a single OpenAI TTS request (rate limited, with retries) and return the MP3 bytes."""
+    response = call_provider(
+        "speech",
+        client.audio.speech.create,
+        model=TTS_MODEL,
+        voice=TTS_VOICE,
+        input=text,
+        speed=TTS_SPEED
+    )
+    return response.content
+
+
+def synthesize_narration(text, openai_api_key=None, max_concurrency=None, use_cache=True):
+    """
+    Return MP3 bytes for every segment of text (see split_tts_segments), in order.
+
+    Each segment is looked up in the on-disk TTS cache and only the misses
+    are sent to the API, concurrently (at most max_concurrency requests in
+    flight, default BRAINROT_TTS_CONCURRENCY).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    segments = split_tts_segments(text)
+    if not segments:
+        raise ValueError("No speakable text to synthesize.")
+
+    audio_chunks = [None] * len(segments)
+    cache = get_tts_cache() if use_cache else None
+    if cache is not None:
+        for i, segment in enumerate(segments):
+            audio_chunks[i] = cache.get(tts_cache_key(segment))
+
+    # Identical segments only need to be synthesized once per narration
+    missing = list(dict.fromkeys(segment for segment, data in zip(segments, audio_chunks) if data is None))
+    cached_count = sum(1 for data in audio_chunks if data is not None)
+    print(f"  > {len(segments)} narration segments ({cached_count} from TTS cache)")
 
-        # Export the combined audio
-        combined.export(output_audio_path, format="mp3")
+    if missing:
+        api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable or pass openai_api_key parameter.")
+
+        # Shared pooled client: workers reuse keep-alive connections
+        client = get_openai_client(api_key)
+
+        workers = min(max_concurrency or TTS_MAX_CONCURRENCY, len(missing))
+        print(f"  > Generating {len(missing)} audio segments with OpenAI TTS 'echo' ({workers} in parallel)...")
+
+        # pool.map preserves input order, so results line up with missing
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            synthesized = dict(zip(missing, pool.map(lambda segment: synthesize_speech(client, segment), missing)))
+
+        for i, segment in enumerate(segments):
+            if audio_chunks[i] is None:
+                audio_chunks[i] = synthesized[segment]
+
+        if cache is not None:
+            for segment, data in synthesized.items():
+                cache.set(tts_cache_key(segment), data)
+
+    return audio_chunks
+
+
+# Longest silence frame joining may leave between two chunks before join_audio re-encodes instead
+MP3_JOIN_MAX_GAP_SECONDS = 0.1
+
+
+def join_audio(audio_chunks):
+    """
+    Join MP3 chunks, in order, into a single MP3 (returned as bytes).
+
+    TTS chunks all share one encoding, so their frames are concatenated
+    directly (see mp3_frames). That plays each chunk's encoder delay/padding,
+    a short silence at every join, which falls between sentences. Chunks that
+    cannot be joined that way, or whose joins would be silent for longer than
+    MP3_JOIN_MAX_GAP_SECONDS, are decoded (trimming delay/padding) and
+    re-encoded with pydub.
+    """
+    if len(audio_chunks) == 1:
+        return audio_chunks[0]
+
+    try:
+        joined, info = mp3_frames.concat_mp3(audio_chunks)
+    except ValueError as e:
+        print(f"  > Cannot join MP3 frames directly ({e}), re-encoding...")
+        return _join_audio_decoded(audio_chunks)
+
+    gap_seconds = info.gap_samples / info.sample_rate / (len(audio_chunks) - 1)
+    if gap_seconds > MP3_JOIN_MAX_GAP_SECONDS:
+        print(f"  > MP3 joins would add {gap_seconds * 1000:.0f} ms of silence each, re-encoding...")
+        return _join_audio_decoded(audio_chunks)
+    return joined
+
+
+def _join_audio_decoded(audio_chunks):
+    import io
+    from pydub import AudioSegment
+
+    audio_segments = [AudioSegment.from_file(io.BytesIO(data), format="mp3") for data in audio_chunks]
+
+    # Bring every chunk to a common sample rate/width/channels, then join the PCM once
+    # (repeated += would copy the growing result once per chunk)
+    frame_rate = max(segment.frame_rate for segment in audio_segments)
+    channels = max(segment.channels for segment in audio_segments)
+    sample_width = max(segment.sample_width for segment in audio_segments)
+    pcm = b"".join(
+        segment.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(sample_width).raw_data
+        for segment in audio_segments
+    )
+    combined = AudioSegment(data=pcm, sample_width=sample_width, frame_rate=frame_rate, channels=channels)
+
+    output = io.BytesIO()
+    combined.export(output, format="mp3")
+    return output.getvalue()
+
+
+def mp3_duration(data):
+    """Duration of MP3 bytes in seconds, read from the frame headers (no decoding)."""
+    return mp3_frames.mp3_duration(data)
+
+
+def generate_tts_audio(text, output_audio_path="brainrot_audio.mp3", elevenlabs_api_key=None, openai_api_key=None,
+                       max_concurrency=None, use_cache=True):
+    """
+    Generate audio from text using OpenAI TTS API (faster and more reliable).
+    Uses 'echo' voice which is energetic and perfect for brainrot content.
+
+    The narration is synthesized in sentence groups through the TTS cache (see
+    synthesize_narration). Segments are kept in memory and stitched in
+    order, so nothing is written to the working directory except
+    output_audio_path.
+    """
+    audio_chunks = synthesize_narration(text, openai_api_key, max_concurrency, use_cache)
+
+    # Concatenate all audio segments
+    if len(audio_chunks) > 1:
+        print(f"  > Merging {len(audio_chunks)} audio segments...")
+    with open(output_audio_path, "wb") as f:
+        f.write(join_audio(audio_chunks))
 
     print(f"  > Audio saved to {output_audio_path}")
 
@@ -248,70 +760,797 @@ def create_text_chunks(text, audio_duration, min_duration_per_chunk=0.8):
     return chunks
 
 
-def create_video_with_audio_ffmpeg(background_video_path, audio_path, brainrot_text="", output_path="output.mp4"):
+# A pre-rendered caption: the cropped overlay pixels plus where they go on the frame.
+# premultiplied holds rgb * alpha and inverse_alpha holds 255 - alpha (both uint16),
+# so blending is out = (frame * inverse_alpha + premultiplied) / 255.
+CaptionOverlay = namedtuple("CaptionOverlay", ["x", "y", "premultiplied", "inverse_alpha"])
+
+
+@lru_cache(maxsize=None)
+def load_caption_font(size=24):
+    """Load the caption font (once per size), falling back to PIL's default if Arial is missing."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except:
+        try:
+            return ImageFont.truetype("Arial.ttf", size)
+        except:
+            try:
+                return ImageFont.truetype("C:/Windows/Fonts/arial.ttf", size)
+            except:
+                return ImageFont.load_default()
+
+
+def wrap_text(text, font, max_width, stroke_width=3):
+    """Wrap text to fit within max_width, breaking at word boundaries.
+
+    CRITICAL: Must include stroke_width in measurement to account for text outline.
     """
-    ULTRA-FAST: Use FFmpeg directly for text overlays (10-100x faster than PIL per-frame rendering).
-    Falls back to MoviePy if FFmpeg text rendering fails.
+    from PIL import Image, ImageDraw
+
+    # One scratch draw object for all measurements
+    measure_draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+
+    words = text.split()
+    lines = []
+    current_line = []
+
+    for word in words:
+        test_line = ' '.join(current_line + [word])
+        # Measure WITH stroke_width
+        bbox = measure_draw.textbbox((0, 0), test_line, font=font, stroke_width=stroke_width)
+        line_width = bbox[2] - bbox[0]
+
+        if line_width <= max_width:
+            current_line.append(word)
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+            else:
+                # Single word is too long, force it
+                lines.append(word)
+
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    return lines
+
+
+def render_caption_overlay(text, font, video_width, video_height):
+    """
+    Render one caption (white fill, black outline, bottom centre, 80% width)
+    and return it as a CaptionOverlay cropped to its visible pixels, or None
+    if nothing visible was drawn.
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    overlay = Image.new('RGBA', (video_width, video_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+
+    # Add horizontal padding (10% on each side = 80% usable width)
+    horizontal_padding = int(video_width * 0.1)
+    max_text_width = video_width - (2 * horizontal_padding)
+
+    # Wrap text to fit within bounds (with stroke width)
+    outline_width = 3
+    wrapped_lines = wrap_text(text, font, max_text_width, stroke_width=outline_width)
+
+    # Calculate total text block height
+    line_height = 30  # Approximate line height for 24pt font
+    total_text_height = len(wrapped_lines) * line_height
+
+    # Position text block at bottom center with vertical padding
+    y_start = video_height - total_text_height - 100
+
+    # Draw each line
+    for i, line in enumerate(wrapped_lines):
+        # Get line bounding box for centering (MUST include stroke_width)
+        bbox = draw.textbbox((0, 0), line, font=font, stroke_width=outline_width)
+        line_width = bbox[2] - bbox[0]
+
+        # Center the line horizontally
+        x = (video_width - line_width) // 2
+        y = y_start + (i * line_height)
+
+        # Draw black outline (stroke)
+        for adj_x in range(-outline_width, outline_width + 1):
+            for adj_y in range(-outline_width, outline_width + 1):
+                if adj_x != 0 or adj_y != 0:
+                    draw.text((x + adj_x, y + adj_y), line, font=font, fill='black')
+
+        # Draw white text on top
+        draw.text((x, y), line, font=font, fill='white')
+
+    # Crop to the pixels that were actually drawn - captions only cover a band near the bottom
+    bbox = overlay.getchannel('A').getbbox()
+    if bbox is None:
+        return None
+
+    rgba = np.asarray(overlay.crop(bbox), dtype=np.uint16)
+    alpha = rgba[..., 3:4]
+    return CaptionOverlay(
+        x=bbox[0],
+        y=bbox[1],
+        premultiplied=np.ascontiguousarray(rgba[..., :3] * alpha),
+        inverse_alpha=np.ascontiguousarray(255 - alpha),
+    )
+
+
+def blend_caption(frame, caption):
+    """Alpha-blend a CaptionOverlay into frame in place, touching only the caption region."""
+    height, width = caption.inverse_alpha.shape[:2]
+    region = frame[caption.y:caption.y + height, caption.x:caption.x + width]
+
+    # uint16 math: 255 * 255 + 127 still fits, so no float temporaries are needed
+    blended = region * caption.inverse_alpha
+    blended += caption.premultiplied
+    blended += 127  # Round to nearest
+    blended //= 255
+    region[...] = blended
+    return frame
+
+
+# Worker processes used to pre-render captions before encoding starts. A video has
+# a few hundred captions at most, so more workers would only add start-up time
+CAPTION_RENDER_WORKERS = int(os.getenv("BRAINROT_CAPTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Below this many unique captions a process pool costs more than it saves
+CAPTION_PARALLEL_MIN = 8
+
+_caption_worker_font = None
+
+
+def _init_caption_worker(font_size):
+    """Load the caption font once per worker process."""
+    global _caption_worker_font
+    _caption_worker_font = load_caption_font(font_size)
+
+
+def _render_caption_in_worker(job):
+    text, video_width, video_height = job
+    return render_caption_overlay(text, _caption_worker_font, video_width, video_height)
+
+
+class FrameStats:
+    """
+    Per-frame timings of a render, collected when a job is profiled.
+
+    On the MoviePy path, fetch is MoviePy returning the background frame
+    (decode, or a seek when the loop wraps), blend is the caption composite.
+    caption_changes counts frames whose overlay differs from the previous
+    frame's - the only time a caption buffer that isn't already hot in cache
+    is touched. Frames fetched 10x slower than the median are counted as
+    reader stalls.
+
+    On the FFmpeg paths frames never pass through Python, so encoder
+    throughput is sampled from FFmpeg's -progress reports instead (about
+    twice a second per process): each report gives the frames encoded since
+    the previous one and the window of wall time they took. The per-frame
+    cost is that of one encoder; encode_fps divides all frames by the wall
+    time any encoder was running, since parallel segment encodes overlap.
+
+    render_path records which renderer produced the video.
+    """
+
+    SLOW_FETCH_FACTOR = 10
+
+    def __init__(self):
+        self.render_path = None
+        self.fetch = []
+        self.blend = []
+        self.captioned = 0
+        self.caption_changes = 0
+        self._last_caption = None
+        self.encode_windows = []  # (frames, started, ended) per FFmpeg progress report
+
+    def record(self, fetch_seconds, blend_seconds, caption):
+        self.fetch.append(fetch_seconds)
+        self.blend.append(blend_seconds)
+        if caption is not None:
+            self.captioned += 1
+            if caption is not self._last_caption:
+                self.caption_changes += 1
+        self._last_caption = caption
+
+    def record_encode(self, frames, started, ended):
+        self.encode_windows.append((frames, started, ended))
+
+    def _encode_wall_seconds(self):
+        """Wall time during which at least one encoder was running (the union of the windows)."""
+        wall = 0.0
+        reached = None
+        for _, started, ended in sorted(self.encode_windows, key=lambda window: window[1]):
+            if reached is None or started > reached:
+                wall += ended - started
+                reached = ended
+            elif ended > reached:
+                wall += ended - reached
+                reached = ended
+        return wall
+
+    @staticmethod
+    def _percentiles_ms(samples):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+
+        def at(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+        return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": round(ordered[-1] * 1000, 3),
+                "mean": round(sum(ordered) / len(ordered) * 1000, 3)}
+
+    def summary(self):
+        totals = [fetch + blend for fetch, blend in zip(self.fetch, self.blend)]
+        median_fetch = sorted(self.fetch)[len(self.fetch) // 2] if self.fetch else 0.0
+        encoded_frames = sum(frames for frames, _, _ in self.encode_windows)
+        encode_seconds = self._encode_wall_seconds()
+        return {
+            "render_path": self.render_path,
+            "frames": len(totals) or encoded_frames,
+            "make_frame_ms": self._percentiles_ms(totals),
+            "fetch_ms": self._percentiles_ms(self.fetch),
+            "blend_ms": self._percentiles_ms(self.blend),
+            "captioned_frames": self.captioned,
+            "caption_changes": self.caption_changes,
+            "reader_stalls": sum(1 for fetch in self.fetch if fetch > self.SLOW_FETCH_FACTOR * median_fetch > 0),
+            "encode_ms_per_frame": self._percentiles_ms([(ended - started) / frames
+                                                         for frames, started, ended in self.encode_windows]),
+            "encode_wall_seconds": round(encode_seconds, 3) if self.encode_windows else None,
+            "encode_fps": round(encoded_frames / encode_seconds, 2) if encode_seconds else None,
+        }
+
+
+class CaptionTimeline:
+    """Pre-rendered captions indexed by start time for O(log n) lookup per frame."""
+
+    def __init__(self, text_chunks, overlays):
+        self.starts = [start_time for _, start_time, _ in text_chunks]
+        self.ends = [end_time for _, _, end_time in text_chunks]
+        self.overlays = overlays
+
+    def __len__(self):
+        return len(self.overlays)
+
+    def overlay_at(self, t):
+        """Return the CaptionOverlay active at time t, or None."""
+        i = bisect_right(self.starts, t) - 1
+        if i < 0 or t >= self.ends[i]:
+            return None
+        return self.overlays[i]
+
+
+def compile_caption_timeline(text_chunks, video_width, video_height, font_size=24, workers=None):
+    """
+    Render every caption from create_text_chunks up front and index them by time.
+
+    Unique caption texts are rendered across a process pool (PIL text drawing
+    holds the GIL), so frame generation afterwards is a pure lookup plus blend.
+    """
+    unique_texts = list(dict.fromkeys(chunk_text for chunk_text, _, _ in text_chunks))
+    workers = min(workers or CAPTION_RENDER_WORKERS, len(unique_texts))
+
+    if workers > 1 and len(unique_texts) >= CAPTION_PARALLEL_MIN:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        jobs = [(text, video_width, video_height) for text in unique_texts]
+        # spawn, not fork: with the memory job store this runs on a render thread of the API process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_caption_worker, initargs=(font_size,)) as pool:
+            rendered = list(pool.map(_render_caption_in_worker, jobs,
+                                     chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        font = load_caption_font(font_size)
+        rendered = [render_caption_overlay(text, font, video_width, video_height) for text in unique_texts]
+
+    by_text = dict(zip(unique_texts, rendered))
+    return CaptionTimeline(text_chunks, [by_text[chunk_text] for chunk_text, _, _ in text_chunks])
+
+
+def _ass_timestamp(seconds):
+    """Format seconds as an ASS timestamp (H:MM:SS.cc)."""
+    centiseconds = int(round(max(seconds, 0) * 100))
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    secs, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
+
+
+def _escape_ass_text(text):
+    """Make caption text literal for libass: no override blocks, escapes or hard breaks."""
+    text = " ".join(text.split())
+    # Braces open override blocks and backslashes start escapes, so swap in look-alikes
+    return text.replace("\\", "⧵").replace("{", "｛").replace("}", "｝")
+
+
+def write_ass_subtitles(text_chunks, video_width, video_height, ass_path, font_size=24):
+    """
+    Write the create_text_chunks timeline as an ASS subtitle file that matches
+    the MoviePy caption style: white fill, 3px black outline, bottom centre,
+    wrapped to the middle 80% of the frame, 100px above the bottom edge.
+    """
+    horizontal_padding = int(video_width * 0.1)
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {video_width}",
+        f"PlayResY: {video_height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Caption,Arial,{font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+        f"0,0,0,0,100,100,0,0,1,3,0,2,{horizontal_padding},{horizontal_padding},100,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for chunk_text, start_time, end_time in text_chunks:
+        lines.append(
+            f"Dialogue: 0,{_ass_timestamp(start_time)},{_ass_timestamp(end_time)},Caption,,0,0,0,,"
+            f"{_escape_ass_text(chunk_text)}"
+        )
+
+    with open(ass_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return ass_path
+
+
+# Backgrounds are transcoded once into an output-ready H.264 stream so jobs can loop them by stream copy.
+# Absolute, because the renders run FFmpeg inside their own temp directory.
+BACKGROUND_CACHE_DIR = os.path.abspath(os.path.join(CACHE_ROOT, "backgrounds"))
+BACKGROUND_ENCODE_ARGS = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-pix_fmt', 'yuv420p']
+
+_prepared_backgrounds = {}
+_prepared_backgrounds_lock = threading.Lock()
+
+
+def prepare_background(background_video_path):
+    """
+    Transcode a background video once into a GOP-aligned, output-ready stream.
+
+    The prepared file is H.264/yuv420p with a closed 1-second GOP, no audio,
+    and is trimmed to a whole number of GOPs so every loop iteration starts
+    on a keyframe. It is stored in BACKGROUND_CACHE_DIR keyed by the source
+    path, mtime and size, with its metadata in a JSON sidecar, and memoized
+    in memory so later calls cost a stat().
+
+    Returns:
+        (prepared_path, metadata) where prepared_path is absolute and metadata
+        has duration, fps, width, height
+    """
+    import json
+    import subprocess
+
+    source_path = os.path.abspath(background_video_path)
+    stat = os.stat(source_path)
+    memo_key = (source_path, stat.st_mtime_ns, stat.st_size)
+
+    with _prepared_backgrounds_lock:
+        if memo_key in _prepared_backgrounds:
+            return _prepared_backgrounds[memo_key]
+
+        key = cache_key("background", *memo_key, BACKGROUND_ENCODE_ARGS)
+        prepared_path = os.path.join(BACKGROUND_CACHE_DIR, f"{key}.mp4")
+        metadata_path = os.path.join(BACKGROUND_CACHE_DIR, f"{key}.json")
+
+        if os.path.exists(prepared_path) and os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        else:
+            print(f"  > Preparing background {background_video_path} (one-time transcode)...")
+            os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+
+            # Header probe only - no decoder is started just to read the metadata
+            info = probe_media(source_path)
+            fps = info.fps
+            width, height = info.width, info.height
+            source_frames = int(info.duration * fps)
+
+            gop = max(1, int(round(fps)))
+            frames = (source_frames // gop) * gop or source_frames
+
+            tmp_path = os.path.join(BACKGROUND_CACHE_DIR, f".tmp-{key}-{os.getpid()}.mp4")
+            cmd = [
+                'ffmpeg', '-i', source_path, '-an',
+                '-r', str(fps), '-frames:v', str(frames),
+                *BACKGROUND_ENCODE_ARGS,
+                '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0',
+                '-movflags', '+faststart', '-y', tmp_path
+            ]
+            subprocess.run(cmd, check=True, capture_output=True)
+            os.replace(tmp_path, prepared_path)
+
+            metadata = {"duration": frames / fps, "fps": fps, "width": width, "height": height}
+            with open(metadata_path, "w") as f:
+                json.dump(metadata, f)
+
+        _prepared_backgrounds[memo_key] = (prepared_path, metadata)
+        return prepared_path, metadata
+
+
+def get_audio_duration(audio_path):
+    """
+    Duration of an audio file in seconds.
+
+    MP3s (all narration) are measured from their frame headers; anything
+    else is probed with ffprobe (see media_probe).
+    """
+    if audio_path.lower().endswith(".mp3"):
+        try:
+            return mp3_frames.mp3_file_duration(audio_path)
+        except ValueError as e:
+            print(f"  > Could not read MP3 headers ({e}), probing instead...")
+
+    return probe_media(audio_path).duration
+
+
+# HLS output: fMP4 segments of this many seconds plus a growing "event" playlist
+HLS_SEGMENT_SECONDS = int(os.getenv("BRAINROT_HLS_SEGMENT_SECONDS", "4"))
+HLS_PLAYLIST_NAME = "playlist.m3u8"
+
+
+def _tee_path(path):
+    """Absolute path escaped for use inside a tee muxer output spec."""
+    path = os.path.abspath(path).replace('\\', '/')
+    for char in (':', '|', '[', ']'):
+        path = path.replace(char, '\\' + char)
+    return path
+
+
+def hls_output_args(output_path, hls_dir):
+    """
+    FFmpeg output arguments that write output_path and an HLS rendition in one encode.
+
+    The tee muxer sends the same encoded packets to the MP4 and to the HLS
+    muxer, so the playlist and its segments appear in hls_dir while the
+    render is still running. Segments are fMP4 (so both outputs share the
+    global-header stream layout) and the playlist is an "event" playlist:
+    players can start at the beginning and keep polling it for new segments.
+    """
+    os.makedirs(hls_dir, exist_ok=True)
+    hls_options = ':'.join([
+        'f=hls',
+        f'hls_time={HLS_SEGMENT_SECONDS}',
+        'hls_playlist_type=event',
+        'hls_segment_type=fmp4',
+        'hls_flags=independent_segments+temp_file',
+        f"hls_segment_filename={_tee_path(os.path.join(hls_dir, 'segment_%05d.m4s'))}",
+    ])
+    outputs = f"[f=mp4:movflags=+faststart]{_tee_path(output_path)}|[{hls_options}]{_tee_path(os.path.join(hls_dir, HLS_PLAYLIST_NAME))}"
+    return ['-flags', '+global_header', '-f', 'tee', outputs]
+
+
+def run_ffmpeg(cmd, duration=None, progress_callback=None, cwd=None, frame_stats=None):
+    """
+    Run an FFmpeg command, reporting encoder progress from -progress output.
+
+    progress_callback(fraction) is called with out_time / duration as FFmpeg
+    reports it (about twice a second) and with 1.0 when the encode ends.
+    frame_stats, if given, records the frames encoded and wall time between
+    reports (see FrameStats).
+    Raises subprocess.CalledProcessError with FFmpeg's stderr on failure.
     """
     import subprocess
     import tempfile
 
+    report = progress_callback is not None and duration
+    if not report and frame_stats is None:
+        subprocess.run(cmd, check=True, capture_output=True, cwd=cwd)
+        return
+
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats', *cmd[1:]]
+
+    # stderr goes to a file so a chatty FFmpeg can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, cwd=cwd, text=True)
+        frame = last_frame = 0
+        last_report = perf_counter()
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key == 'frame' and value.isdigit():
+                frame = int(value)
+            elif key == 'out_time_us' and value.isdigit() and report:
+                progress_callback(min(1.0, int(value) / 1_000_000 / duration))
+            elif key == 'progress':
+                # "progress" closes each report
+                if frame_stats is not None and frame > last_frame:
+                    now = perf_counter()
+                    frame_stats.record_encode(frame - last_frame, last_report, now)
+                    last_frame, last_report = frame, now
+                if value == 'end' and report:
+                    progress_callback(1.0)
+        returncode = process.wait()
+
+        if returncode != 0:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr_file.read())
+
+
+def _moviepy_progress_logger(progress_callback):
+    """A proglog logger that forwards MoviePy's frame counter to progress_callback."""
+    from proglog import ProgressBarLogger
+
+    class FrameProgressLogger(ProgressBarLogger):
+        # MoviePy 1.x names the video frame bar 't', 2.x names it 'frame_index'
+        FRAME_BARS = ('t', 'frame_index')
+
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if bar in self.FRAME_BARS and attr == 'index':
+                total = self.bars[bar].get('total')
+                if total:
+                    progress_callback(min(1.0, (value + 1) / total))
+
+    return FrameProgressLogger()
+
+
+def create_video_with_audio_ffmpeg(background_video_path, audio_path, brainrot_text="", output_path="output.mp4",
+                                   progress_callback=None, hls_dir=None, frame_stats=None):
+    """
+    ULTRA-FAST: Use FFmpeg directly for text overlays (10-100x faster than PIL per-frame rendering).
+
+    Captions are written as an ASS subtitle file and burned in by the
+    subtitles filter in the same FFmpeg pass that loops the background, so a
+    captioned render never goes through Python frame by frame.
+    Falls back to MoviePy if FFmpeg fails (e.g. a build without libass).
+
+    progress_callback(fraction), if given, receives real encoder progress.
+    hls_dir, if given, also receives an HLS playlist and segments as they are
+    encoded (see hls_output_args). The MoviePy fallback only writes the MP4.
+    frame_stats (FrameStats), if given, records which renderer ran and the
+    encoder's per-frame throughput (per-frame timings on the MoviePy fallback).
+    """
+    import shutil
+    import tempfile
+
     try:
         # Load the audio to get its duration
-        audio_clip = AudioFileClip(audio_path)
-        audio_duration = audio_clip.duration
-        audio_clip.close()
-
-        # Load video to get info
-        video_clip = VideoFileClip(background_video_path)
-        video_duration = video_clip.duration
-        video_fps = video_clip.fps
-        video_clip.close()
-
-        # Calculate loops needed
-        num_loops = int(audio_duration / video_duration) + 1
-
-        if not brainrot_text:
-            # No text - just loop video with audio
-            filter_complex = f"[0:v]loop={num_loops}:size=999999:start=0,trim=duration={audio_duration}[v]"
+        audio_duration = get_audio_duration(audio_path)
+
+        # Background is transcoded once and looped by demuxing it again (-stream_loop), never by buffering frames
+        prepared_path, background = prepare_background(background_video_path)
+        video_width, video_height = background["width"], background["height"]
+
+        with tempfile.TemporaryDirectory(prefix="brainrot_ffmpeg_") as work_dir:
             cmd = [
-                'ffmpeg', '-i', background_video_path, '-i', audio_path,
-                '-filter_complex', filter_complex,
-                '-map', '[v]', '-map', '1:a',
-                '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
+                'ffmpeg', '-stream_loop', '-1', '-i', prepared_path, '-i', os.path.abspath(audio_path),
+            ]
+
+            if brainrot_text:
+                text_chunks = create_text_chunks(brainrot_text, audio_duration, min_duration_per_chunk=0.8)
+                write_ass_subtitles(text_chunks, video_width, video_height, os.path.join(work_dir, "captions.ass"))
+                # FFmpeg runs inside work_dir, so the filter only ever sees this plain relative name
+                cmd += [
+                    '-filter_complex', '[0:v]subtitles=captions.ass[v]',
+                    '-map', '[v]', '-map', '1:a',
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
+                ]
+                if hls_dir:
+                    # Keyframe on every segment boundary so segments are cut exactly HLS_SEGMENT_SECONDS apart
+                    cmd += ['-force_key_frames', f'expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})']
+                print(f"  > Running FFmpeg for video loop + {len(text_chunks)} burned-in captions + audio...")
+            else:
+                # The prepared background is already output-ready: copy it, only the audio is encoded
+                # (its 1-second GOP also puts a keyframe on every HLS segment boundary)
+                cmd += ['-map', '0:v', '-map', '1:a', '-c:v', 'copy']
+                print("  > Running FFmpeg for video loop (stream copy) + audio...")
+
+            cmd += [
                 '-c:a', 'aac', '-b:a', '192k',
-                '-threads', '8', '-y', output_path
+                '-t', str(audio_duration),
+                '-threads', '8', '-y',
             ]
-            print("  > Running FFmpeg for video loop + audio...")
-            subprocess.run(cmd, check=True, capture_output=True)
-            return output_path
-        else:
-            # FALLBACK: FFmpeg text escaping is too unreliable
-            # Use MoviePy with optimized caching instead
-            print(f"  > FFmpeg text rendering is unreliable - using optimized MoviePy with caching...")
-            return create_video_with_audio(background_video_path, audio_path, brainrot_text, output_path)
+            if hls_dir:
+                cmd += hls_output_args(output_path, hls_dir)
+            else:
+                # moov atom up front so playback can start before the whole file is downloaded
+                cmd += ['-movflags', '+faststart', os.path.abspath(output_path)]
+            run_ffmpeg(cmd, audio_duration, progress_callback, cwd=work_dir, frame_stats=frame_stats)
+
+        if frame_stats is not None:
+            frame_stats.render_path = "ffmpeg"
+        return output_path
 
     except Exception as e:
         print(f"  > FFmpeg failed ({e}), falling back to MoviePy...")
-        return create_video_with_audio(background_video_path, audio_path, brainrot_text, output_path)
+        if hls_dir:
+            # Don't leave a truncated playlist behind for players to pick up
+            shutil.rmtree(hls_dir, ignore_errors=True)
+        return create_video_with_audio(background_video_path, audio_path, brainrot_text, output_path,
+                                       progress_callback=progress_callback, frame_stats=frame_stats)
+
 
+# Parallel render: the timeline is cut into segments that are encoded side by side,
+# each by its own FFmpeg process with this many threads. RENDER_SEGMENTS fills the
+# machine for one render; callers running several renders at once divide it between them.
+RENDER_SEGMENT_THREADS = 4
+RENDER_SEGMENTS = int(os.getenv("BRAINROT_RENDER_SEGMENTS",
+                                str(max(1, (os.cpu_count() or 1) // RENDER_SEGMENT_THREADS))))
+# Shorter segments cost more in FFmpeg start-up than they save
+MIN_SEGMENT_SECONDS = 10
 
-def create_video_with_audio(background_video_path, audio_path, brainrot_text="", output_path="output.mp4"):
+
+def render_video_segment(prepared_background, background, text_chunks, start_time, end_time, output_path,
+                         frame_stats=None):
+    """
+    Render the [start_time, end_time) slice of the timeline as a video-only segment.
+
+    Frame counts come from the absolute timeline (round(t * fps)), so segment
+    boundaries never drift from the audio however many segments there are.
+    The background continues where the previous segment left off, and
+    text_chunks (timed relative to start_time) are burned in with the same
+    ASS style as a single render. Segments share encoder settings, so they
+    can be joined by stream copy (concat_segments). frame_stats, if given,
+    records the encoder's throughput (see run_ffmpeg).
+    """
+    import tempfile
+
+    fps = background["fps"]
+    first_frame = round(start_time * fps)
+    frames = max(1, round(end_time * fps) - first_frame)
+    offset = (first_frame / fps) % background["duration"]
+
+    with tempfile.TemporaryDirectory(prefix="brainrot_segment_") as work_dir:
+        write_ass_subtitles(text_chunks, background["width"], background["height"],
+                            os.path.join(work_dir, "captions.ass"))
+        cmd = [
+            'ffmpeg', '-ss', f"{offset:.3f}", '-stream_loop', '-1', '-i', os.path.abspath(prepared_background),
+            '-vf', 'subtitles=captions.ass',
+            '-frames:v', str(frames), '-an',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23', '-pix_fmt', 'yuv420p',
+            '-threads', str(RENDER_SEGMENT_THREADS), '-y', os.path.abspath(output_path)
+        ]
+        run_ffmpeg(cmd, cwd=work_dir, frame_stats=frame_stats)
+
+    return output_path
+
+
+def concat_segments(segment_paths, audio_path, output_path, work_dir):
+    """Join video-only segments by stream copy and mux them with the narration."""
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    cmd = [
+        'ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_path, '-i', os.path.abspath(audio_path),
+        '-map', '0:v', '-map', '1:a',
+        '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
+        '-movflags', '+faststart', '-y', os.path.abspath(output_path)
+    ]
+    run_ffmpeg(cmd)
+    return output_path
+
+
+def split_timeline(text_chunks, duration, segments):
+    """
+    Cut a caption timeline into up to `segments` contiguous spans of similar length.
+
+    Cuts only fall on caption-chunk boundaries, so no caption is split across
+    two segments. Returns [(start, end, chunks relative to start), ...].
+    """
+    segments = max(1, min(segments, int(duration // MIN_SEGMENT_SECONDS)))
+
+    if not text_chunks:
+        bounds = [duration * i / segments for i in range(segments + 1)]
+    else:
+        bounds = [0.0]
+        for _, _, end_time in text_chunks[:-1]:
+            if len(bounds) == segments:
+                break
+            if end_time >= duration * len(bounds) / segments:
+                bounds.append(end_time)
+        bounds.append(duration)
+
+    spans = []
+    for start, end in zip(bounds, bounds[1:]):
+        chunks = [(chunk_text, chunk_start - start, chunk_end - start)
+                  for chunk_text, chunk_start, chunk_end in text_chunks
+                  if start <= chunk_start < end]
+        spans.append((start, end, chunks))
+    return spans
+
+
+def create_video_with_audio_parallel(background_video_path, audio_path, brainrot_text="", output_path="output.mp4",
+                                     progress_callback=None, segments=None, frame_stats=None):
+    """
+    PARALLEL: Render the timeline as independent segments on all cores, then join them by stream copy.
+
+    A single x264 ultrafast encode stops scaling long before 32 cores, so the
+    captioned timeline is split at caption-chunk boundaries into `segments`
+    (default RENDER_SEGMENTS) pieces, each encoded by its own FFmpeg process.
+    The segments are concatenated without re-encoding and muxed with the
+    narration. Falls back to a single render if anything goes wrong.
+
+    progress_callback(fraction), if given, is called as segments finish.
+    frame_stats records the renderer and every segment encoder's throughput.
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Without captions the single render is already a stream copy
+    if not brainrot_text:
+        return create_video_with_audio_ffmpeg(background_video_path, audio_path, brainrot_text, output_path,
+                                              progress_callback=progress_callback, frame_stats=frame_stats)
+
+    audio_duration = get_audio_duration(audio_path)
+    text_chunks = create_text_chunks(brainrot_text, audio_duration, min_duration_per_chunk=0.8)
+    spans = split_timeline(text_chunks, audio_duration, segments or RENDER_SEGMENTS)
+    if len(spans) == 1:
+        return create_video_with_audio_ffmpeg(background_video_path, audio_path, brainrot_text, output_path,
+                                              progress_callback=progress_callback, frame_stats=frame_stats)
+
+    try:
+        prepared_path, background = prepare_background(background_video_path)
+        print(f"  > Rendering {len(spans)} segments in parallel ({RENDER_SEGMENT_THREADS} threads each)...")
+
+        with tempfile.TemporaryDirectory(prefix="brainrot_parallel_") as work_dir:
+            segment_paths = [os.path.join(work_dir, f"segment_{i:04d}.mp4") for i in range(len(spans))]
+            rendered = 0.0
+
+            # The encodes run in FFmpeg processes; the threads only wait on them
+            with ThreadPoolExecutor(max_workers=len(spans)) as pool:
+                futures = {
+                    pool.submit(render_video_segment, prepared_path, background, chunks, start, end, path,
+                                frame_stats): end - start
+                    for (start, end, chunks), path in zip(spans, segment_paths)
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    rendered += futures[future]
+                    if progress_callback:
+                        progress_callback(min(0.95, 0.95 * rendered / audio_duration))
+
+            print("  > Joining segments (stream copy) + audio...")
+            concat_segments(segment_paths, audio_path, output_path, work_dir)
+
+        if progress_callback:
+            progress_callback(1.0)
+        if frame_stats is not None:
+            frame_stats.render_path = "parallel"
+        return output_path
+
+    except Exception as e:
+        print(f"  > Parallel render failed ({e}), falling back to a single render...")
+        return create_video_with_audio_ffmpeg(background_video_path, audio_path, brainrot_text, output_path,
+                                              progress_callback=progress_callback, frame_stats=frame_stats)
+
+
+def create_video_with_audio(background_video_path, audio_path, brainrot_text="", output_path="output.mp4",
+                            progress_callback=None, frame_stats=None):
     """
     Overlay audio and text captions onto a looping background video.
     The video will loop to match the audio duration.
     Text appears with white fill and black outline for readability.
+
+    progress_callback(fraction), if given, receives the writer's frame progress.
+    frame_stats (FrameStats), if given, records every make_frame call's timings.
     """
     try:
         from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips, TextClip, CompositeVideoClip
     except ImportError:
         from moviepy import VideoFileClip, AudioFileClip, concatenate_videoclips, TextClip, CompositeVideoClip
+    import numpy as np
 
     # Load the audio to get its duration
     audio_clip = AudioFileClip(audio_path)
     audio_duration = audio_clip.duration
 
-    # Load the background video
+    # Load the background video (the prepared, output-ready copy when FFmpeg is available)
+    try:
+        background_video_path, _ = prepare_background(background_video_path)
+    except Exception as e:
+        print(f"  > Could not prepare background ({e}), using the original file...")
     video_clip = VideoFileClip(background_video_path)
     video_duration = video_clip.duration
     video_width, video_height = video_clip.size
@@ -337,125 +1576,36 @@ def create_video_with_audio(background_video_path, audio_path, brainrot_text="",
         print("  > Adding OPTIMIZED text overlays (updates every ~1 second)...")
         text_chunks = create_text_chunks(brainrot_text, audio_duration, min_duration_per_chunk=0.8)
 
-        # Pre-load font once (not per-frame)
-        try:
-            font = ImageFont.truetype("arial.ttf", 24)
-        except:
-            try:
-                font = ImageFont.truetype("Arial.ttf", 24)
-            except:
-                try:
-                    font = ImageFont.truetype("C:/Windows/Fonts/arial.ttf", 24)
-                except:
-                    font = ImageFont.load_default()
+        # Render every caption before encoding starts (in parallel across worker processes)
+        print(f"  > Pre-rendering {len(text_chunks)} captions...")
+        timeline = compile_caption_timeline(text_chunks, video_width, video_height)
 
         # Save reference to video with audio before creating text overlay
         base_video = final_video
 
-        # CRITICAL OPTIMIZATION: Cache text rendering per chunk
-        frame_cache = {}
-
-        def get_text_for_time(t):
-            """Find which text chunk should be displayed at this time."""
-            for chunk_text, start_time, end_time in text_chunks:
-                if start_time <= t < end_time:
-                    return chunk_text
-            return ""
-
-        # Helper function to wrap text to fit within width
-        def wrap_text(text, font, max_width, stroke_width=3):
-            """Wrap text to fit within max_width, breaking at word boundaries.
-
-            CRITICAL: Must include stroke_width in measurement to account for text outline.
-            """
-            words = text.split()
-            lines = []
-            current_line = []
-
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                # Use a temporary draw object to measure WITH stroke_width
-                test_draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
-                bbox = test_draw.textbbox((0, 0), test_line, font=font, stroke_width=stroke_width)
-                line_width = bbox[2] - bbox[0]
-
-                if line_width <= max_width:
-                    current_line.append(word)
-                else:
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                    else:
-                        # Single word is too long, force it
-                        lines.append(word)
-
-            if current_line:
-                lines.append(' '.join(current_line))
-
-            return lines
-
-        # Create a function to overlay text on each frame with caching
+        # Frame generation is a timeline lookup plus an in-place blend of the caption band
         def make_frame(t):
+            if frame_stats is not None:
+                started = perf_counter()
+
             # Get the frame at time t from the base video
             frame = base_video.get_frame(t)
-            current_text = get_text_for_time(t)
-
-            if current_text:
-                # Check cache first - if we've rendered this text before, reuse the overlay
-                cache_key = current_text
-                if cache_key not in frame_cache:
-                    # Create text overlay image (only once per unique text)
-                    overlay = Image.new('RGBA', (video_width, video_height), (0, 0, 0, 0))
-                    draw = ImageDraw.Draw(overlay)
-
-                    # Add horizontal padding (10% on each side = 80% usable width)
-                    horizontal_padding = int(video_width * 0.1)
-                    max_text_width = video_width - (2 * horizontal_padding)
-
-                    # Wrap text to fit within bounds (with stroke width)
-                    outline_width = 3
-                    wrapped_lines = wrap_text(current_text, font, max_text_width, stroke_width=outline_width)
-
-                    # Calculate total text block height
-                    line_height = 30  # Approximate line height for 24pt font
-                    total_text_height = len(wrapped_lines) * line_height
-
-                    # Position text block at bottom center with vertical padding
-                    y_start = video_height - total_text_height - 100
-
-                    # Draw each line
-                    for i, line in enumerate(wrapped_lines):
-                        # Get line bounding box for centering (MUST include stroke_width)
-                        bbox = draw.textbbox((0, 0), line, font=font, stroke_width=outline_width)
-                        line_width = bbox[2] - bbox[0]
-
-                        # Center the line horizontally
-                        x = (video_width - line_width) // 2
-                        y = y_start + (i * line_height)
-
-                        # Draw black outline (stroke)
-                        for adj_x in range(-outline_width, outline_width + 1):
-                            for adj_y in range(-outline_width, outline_width + 1):
-                                if adj_x != 0 or adj_y != 0:
-                                    draw.text((x + adj_x, y + adj_y), line, font=font, fill='black')
-
-                        # Draw white text on top
-                        draw.text((x, y), line, font=font, fill='white')
-
-                    # Cache the overlay as numpy array
-                    frame_cache[cache_key] = np.array(overlay)
-
-                # Composite cached text overlay onto frame
-                overlay_array = frame_cache[cache_key]
-                img = Image.fromarray(frame)
-                overlay_img = Image.fromarray(overlay_array)
-                img.paste(overlay_img, (0, 0), overlay_img)
-                frame = np.array(img)
+            caption = timeline.overlay_at(t)
+
+            if frame_stats is not None:
+                fetched = perf_counter()
 
+            if caption is not None:
+                # The reader may hand back a shared or read-only buffer, so blend into our own copy
+                # (no caption - hand the decoded frame straight through)
+                frame = blend_caption(np.array(frame, dtype=np.uint8, copy=True), caption)
+
+            if frame_stats is not None:
+                frame_stats.record(fetched - started, perf_counter() - fetched, caption)
             return frame
 
         # Apply text overlay to video
-        print(f"  > Applying {len(text_chunks)} text segments to video (with frame caching)...")
+        print(f"  > Applying {len(text_chunks)} text segments to video (pre-rendered)...")
         from moviepy.video.VideoClip import VideoClip
         text_video = VideoClip(make_frame, duration=final_video.duration)
         text_video.fps = video_clip.fps
@@ -471,9 +1621,14 @@ def create_video_with_audio(background_video_path, audio_path, brainrot_text="",
         fps=video_clip.fps,
         preset='ultrafast',  # MUCH faster encoding
         threads=8,           # Use multiple CPU cores
-        bitrate='3000k'      # Good quality for web
+        bitrate='3000k',     # Good quality for web
+        ffmpeg_params=['-movflags', '+faststart'],  # moov atom up front for progressive playback
+        logger=_moviepy_progress_logger(progress_callback) if progress_callback else 'bar'
     )
 
+    if frame_stats is not None:
+        frame_stats.render_path = "moviepy"
+
     # Clean up
     video_clip.close()
     audio_clip.close()
@@ -484,7 +1639,8 @@ def create_video_with_audio(background_video_path, audio_path, brainrot_text="",
 
 
 def generate_brainrot_turbo(pdf_path, background_video="subway.mp4", output_video="output.mp4",
-                           openai_api_key=None, elevenlabs_api_key=None):
+                           openai_api_key=None, elevenlabs_api_key=None, page_range=None,
+                           target_seconds=TARGET_NARRATION_SECONDS):
     """
     TURBO MODE: Generate brainrot video using GPT-5-nano for maximum speed.
 
@@ -496,6 +1652,9 @@ def generate_brainrot_turbo(pdf_path, background_video="subway.mp4", output_vide
         output_video: Path for output video (default: output.mp4)
         openai_api_key: OpenAI API key (optional, can use OPENAI_API_KEY env var)
         elevenlabs_api_key: ElevenLabs API key (optional, can use ELEVENLABS_API_KEY env var)
+        page_range: Optional (start, stop) 0-based page range to read (stop exclusive)
+        target_seconds: Target narration length; extraction stops once the PDF text
+            exceeds what that much narration can cover
 
     Returns:
         Path to the generated video file
@@ -504,7 +1663,7 @@ def generate_brainrot_turbo(pdf_path, background_video="subway.mp4", output_vide
     print("=" * 60)
 
     print("\n[1/4] Extracting text from PDF...")
-    pdf_text = extract_text_from_pdf(pdf_path)
+    pdf_text = extract_text_from_pdf(pdf_path, page_range=page_range, max_chars=source_char_budget(target_seconds))
     print(f"  > Extracted {len(pdf_text)} characters from PDF")
 
     print("\n[2/4] Translating to Gen Z brainrot (GPT-5-nano TURBO)...")
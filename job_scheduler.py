@@ -0,0 +1,148 @@
+"""
+Skibidi-fication 3000 - Job scheduler
+=====================================
+Bounded execution for PDF -> video jobs.
+
+- Admission: at most MAX_QUEUED_JOBS jobs may wait for a worker; beyond
+  that submit() raises QueueFullError so the API can answer 429.
+- I/O-bound stages (PDF extract, LLM, TTS) run on a thread pool of
+  MAX_IO_WORKERS, so several jobs can wait on OpenAI at once.
+- The CPU-bound render stage runs in a process pool of MAX_RENDER_WORKERS,
+  so only that many encodes compete for the cores, and none of them run
+  inside the API process. prewarm() starts the render workers (and runs
+  their initializer) ahead of the first job. With render_processes=False
+  the render workers are threads of the API process instead (for job
+  stores that only live in this process). render_cores() tells a render
+  how many cores are free for it, so an idle machine gives one job all of them.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+MAX_IO_WORKERS = int(os.getenv("BRAINROT_IO_WORKERS", "8"))
+# Each render runs an 8-thread x264 encode
+MAX_RENDER_WORKERS = int(os.getenv("BRAINROT_RENDER_WORKERS", str(max(1, (os.cpu_count() or 1) // 8))))
+MAX_QUEUED_JOBS = int(os.getenv("BRAINROT_MAX_QUEUED_JOBS", "20"))
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def _noop():
+    return os.getpid()
+
+
+class JobScheduler:
+    """Bounded queue in front of an I/O thread pool and a render process pool."""
+
+    def __init__(self, io_workers=MAX_IO_WORKERS, render_workers=MAX_RENDER_WORKERS, max_queued=MAX_QUEUED_JOBS,
+                 render_initializer=None, render_initargs=(), render_processes=True):
+        self.io_workers = io_workers
+        self.render_workers = render_workers
+        self.max_queued = max_queued
+
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="brainrot-io")
+        if render_processes:
+            # spawn, not fork: the API process is multi-threaded
+            self._render_pool = ProcessPoolExecutor(max_workers=render_workers,
+                                                    mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=render_initializer, initargs=render_initargs)
+        else:
+            self._render_pool = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="brainrot-render",
+                                                   initializer=render_initializer, initargs=render_initargs)
+
+        self._lock = threading.Lock()
+        self._waiting = deque()  # Admitted jobs not yet picked up by an I/O worker, in order
+        self._running = set()
+        self._rendering = 0  # Render calls queued for or running in the process pool
+
+    def submit(self, job_id, fn, *args):
+        """
+        Queue fn(job_id, *args) on the I/O pool.
+
+        Returns the job's 1-based queue position.
+        Raises QueueFullError if MAX_QUEUED_JOBS jobs are already waiting.
+        """
+        with self._lock:
+            if len(self._waiting) >= self.max_queued:
+                raise QueueFullError(f"{len(self._waiting)} jobs already queued")
+            self._waiting.append(job_id)
+            position = len(self._waiting)
+
+        self._io_pool.submit(self._run, job_id, fn, args)
+        return position
+
+    def _run(self, job_id, fn, args):
+        with self._lock:
+            self._waiting.remove(job_id)
+            self._running.add(job_id)
+        try:
+            fn(job_id, *args)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def run_render(self, fn, *args, **kwargs):
+        """Run a CPU-bound stage in the render pool and block until it finishes."""
+        with self._lock:
+            self._rendering += 1
+        try:
+            return self._render_pool.submit(fn, *args, **kwargs).result()
+        finally:
+            with self._lock:
+                self._rendering -= 1
+
+    def prewarm(self):
+        """
+        Start every render worker now instead of on the first render.
+
+        Workers are spawned lazily, one per submitted task while none is idle,
+        so submitting render_workers no-ops brings the whole pool up. Does not
+        block; the pool is ready when the no-ops finish.
+        """
+        for _ in range(self.render_workers):
+            self._render_pool.submit(_noop)
+
+    def render_cores(self):
+        """
+        Cores a render submitted now can use.
+
+        The machine's cores are split between this render and the ones already
+        in the pool, up to render_workers of them running at once.
+        """
+        with self._lock:
+            concurrent = min(self._rendering + 1, self.render_workers)
+        return max(1, (os.cpu_count() or 1) // concurrent)
+
+    def active_jobs(self):
+        """IDs of the jobs this scheduler has admitted and not finished (waiting or running)."""
+        with self._lock:
+            return list(self._waiting) + list(self._running)
+
+    def queue_position(self, job_id):
+        """1-based position of a waiting job, or None if it is not waiting."""
+        with self._lock:
+            try:
+                return self._waiting.index(job_id) + 1
+            except ValueError:
+                return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._waiting),
+                "running": len(self._running),
+                "rendering": self._rendering,
+                "max_queued": self.max_queued,
+                "io_workers": self.io_workers,
+                "render_workers": self.render_workers,
+            }
+
+    def shutdown(self):
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        self._render_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,363 @@
+"""
+Skibidi-fication 3000 - Job store
+=================================
+Persistent job state shared by every API worker.
+
+A job is a flat dict: status, stage, progress plus free-form fields
+(step, eta_seconds, error, video_url, filename, ...). Stage changes are
+timestamped automatically into job["timings"]. The store also keeps a
+rolling history of per-stage durations scaled by input size (characters,
+audio seconds, ...), which is what ETAs are estimated from.
+
+The default SQLiteJobStore keeps jobs in a WAL-mode SQLite database, so
+several uvicorn workers (or render processes) on one host can read and
+update the same jobs. Jobs expire JOB_TTL_SECONDS after their last update.
+Set BRAINROT_JOB_STORE=memory for a single-process, in-memory store; the
+API then runs renders on threads instead of render processes, since a
+render process could not see (or update) the API process's jobs.
+"""
+
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+
+
+JOB_STORE_BACKEND = os.getenv("BRAINROT_JOB_STORE", "sqlite")
+JOB_STORE_PATH = os.getenv("BRAINROT_JOB_DB", "jobs.db")
+JOB_TTL_SECONDS = int(os.getenv("BRAINROT_JOB_TTL_HOURS", "24")) * 3600
+
+# Expired rows are purged at most this often
+PURGE_INTERVAL_SECONDS = 60
+
+# ETAs use the median rate over this many recent runs of a stage
+STAGE_RATE_SAMPLES = 50
+
+
+def _apply_update(job, fields, now):
+    """Merge fields into job, recording stage start/end times in job["timings"]."""
+    new_stage = fields.get("stage")
+    if new_stage and new_stage != job.get("stage"):
+        timings = dict(job.get("timings") or {})
+        previous = job.get("stage")
+        if previous in timings and "seconds" not in timings[previous]:
+            timings[previous] = dict(timings[previous], seconds=round(now - timings[previous]["started"], 3))
+        timings[new_stage] = {"started": now}
+        job["timings"] = timings
+
+    if fields.get("status") in ("completed", "failed"):
+        # Close the last open stage when the job finishes
+        timings = dict(job.get("timings") or {})
+        stage = fields.get("stage") or job.get("stage")
+        if stage in timings and "seconds" not in timings[stage]:
+            timings[stage] = dict(timings[stage], seconds=round(now - timings[stage]["started"], 3))
+            job["timings"] = timings
+
+    job.update(fields)
+    job["updated_at"] = now
+    return job
+
+
+class JobStore:
+    """Interface for job state storage."""
+
+    # Whether other processes (render workers) see the same jobs
+    shared_between_processes = False
+
+    def create(self, job_id, **fields):
+        """Create (or replace) a job and return it."""
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Return the job dict, or None if it does not exist or has expired."""
+        raise NotImplementedError
+
+    def update(self, job_id, **fields):
+        """Merge fields into a job and return it, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, job_id):
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Delete expired jobs and return their IDs."""
+        raise NotImplementedError
+
+    def find_completed(self, content_key, exclude_job_id=None):
+        """Most recent unexpired completed job with this content_key, as (job_id, job), or None."""
+        raise NotImplementedError
+
+    def find_by_status(self, *statuses):
+        """Unexpired jobs in any of the given statuses, as [(job_id, job), ...]."""
+        raise NotImplementedError
+
+    def record_stage_duration(self, stage, seconds, units):
+        """Remember that a stage took seconds for an input of the given size."""
+        raise NotImplementedError
+
+    def stage_rate(self, stage):
+        """Median seconds per unit over recent runs of a stage, or None if unknown."""
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    """In-process store for development and single-worker deployments."""
+
+    def __init__(self, ttl_seconds=JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs = {}
+        self._stage_rates = defaultdict(lambda: deque(maxlen=STAGE_RATE_SAMPLES))
+        self._lock = threading.Lock()
+
+    def create(self, job_id, **fields):
+        now = time.time()
+        job = _apply_update({"status": "uploaded", "progress": 0, "stage": None, "created_at": now}, fields, now)
+        with self._lock:
+            self._jobs[job_id] = job
+            return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["updated_at"] + self.ttl_seconds <= time.time():
+                return None
+            return dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(_apply_update(job, fields, time.time()))
+
+    def delete(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["updated_at"] <= cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return expired
+
+    def find_completed(self, content_key, exclude_job_id=None):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            matches = [
+                (job_id, job) for job_id, job in self._jobs.items()
+                if job.get("content_key") == content_key and job["status"] == "completed"
+                and job["updated_at"] > cutoff and job_id != exclude_job_id
+            ]
+        if not matches:
+            return None
+        job_id, job = max(matches, key=lambda match: match[1]["updated_at"])
+        return job_id, dict(job)
+
+    def find_by_status(self, *statuses):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            return [(job_id, dict(job)) for job_id, job in self._jobs.items()
+                    if job["status"] in statuses and job["updated_at"] > cutoff]
+
+    def record_stage_duration(self, stage, seconds, units):
+        if units <= 0:
+            return
+        with self._lock:
+            self._stage_rates[stage].append(seconds / units)
+
+    def stage_rate(self, stage):
+        with self._lock:
+            rates = list(self._stage_rates.get(stage, ()))
+        return statistics.median(rates) if rates else None
+
+
+class SQLiteJobStore(JobStore):
+    """WAL-mode SQLite store safe to share between processes on one host."""
+
+    shared_between_processes = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            stage TEXT,
+            progress INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            content_key TEXT
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+        CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+        CREATE TABLE IF NOT EXISTS stage_durations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage TEXT NOT NULL,
+            units REAL NOT NULL,
+            seconds REAL NOT NULL,
+            recorded_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS stage_durations_stage ON stage_durations (stage, id);
+    """
+
+    # Columns stored outside the JSON blob so they can be indexed and queried
+    # (content_key is kept in both, the column only exists for lookups)
+    COLUMNS = ("status", "stage", "progress", "created_at", "updated_at")
+
+    def __init__(self, path=JOB_STORE_PATH, ttl_seconds=JOB_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._last_purge = 0.0
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        # Databases created before duplicate detection lack content_key
+        if "content_key" not in [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]:
+            conn.execute("ALTER TABLE jobs ADD COLUMN content_key TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_content_key ON jobs (content_key, status)")
+
+    def _connect(self):
+        """One connection per thread; autocommit mode with explicit transactions."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row_to_job(self, row):
+        status, stage, progress, data, created_at, updated_at = row
+        job = json.loads(data)
+        job.update(status=status, stage=stage, progress=progress, created_at=created_at, updated_at=updated_at)
+        return job
+
+    def _write(self, conn, job_id, job):
+        data = {key: value for key, value in job.items() if key not in self.COLUMNS}
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs "
+            "(job_id, status, stage, progress, data, created_at, updated_at, expires_at, content_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, job["status"], job.get("stage"), int(job.get("progress") or 0), json.dumps(data),
+             job["created_at"], job["updated_at"], job["updated_at"] + self.ttl_seconds, job.get("content_key")),
+        )
+
+    def create(self, job_id, **fields):
+        now = time.time()
+        job = _apply_update({"status": "uploaded", "progress": 0, "stage": None, "created_at": now}, fields, now)
+        conn = self._connect()
+        self._write(conn, job_id, job)
+        self._maybe_purge(now)
+        return job
+
+    def get(self, job_id):
+        row = self._connect().execute(
+            "SELECT status, stage, progress, data, created_at, updated_at FROM jobs "
+            "WHERE job_id = ? AND expires_at > ?",
+            (job_id, time.time()),
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        conn = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent read-modify-writes serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT status, stage, progress, data, created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job = _apply_update(self._row_to_job(row), fields, time.time())
+            self._write(conn, job_id, job)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def delete(self, job_id):
+        self._connect().execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def purge_expired(self):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = [row[0] for row in conn.execute("SELECT job_id FROM jobs WHERE expires_at <= ?", (now,))]
+            conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return expired
+
+    def find_completed(self, content_key, exclude_job_id=None):
+        row = self._connect().execute(
+            "SELECT job_id, status, stage, progress, data, created_at, updated_at FROM jobs "
+            "WHERE content_key = ? AND status = 'completed' AND expires_at > ? AND job_id != ? "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (content_key, time.time(), exclude_job_id or ""),
+        ).fetchone()
+        return (row[0], self._row_to_job(row[1:])) if row else None
+
+    def find_by_status(self, *statuses):
+        placeholders = ", ".join("?" * len(statuses))
+        rows = self._connect().execute(
+            "SELECT job_id, status, stage, progress, data, created_at, updated_at FROM jobs "
+            f"WHERE status IN ({placeholders}) AND expires_at > ?",
+            (*statuses, time.time()),
+        ).fetchall()
+        return [(row[0], self._row_to_job(row[1:])) for row in rows]
+
+    def record_stage_duration(self, stage, seconds, units):
+        if units <= 0:
+            return
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO stage_durations (stage, units, seconds, recorded_at) VALUES (?, ?, ?, ?)",
+            (stage, units, seconds, time.time()),
+        )
+        # Only the most recent samples are ever read
+        conn.execute(
+            "DELETE FROM stage_durations WHERE stage = ? AND id <= "
+            "(SELECT id FROM stage_durations WHERE stage = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (stage, stage, STAGE_RATE_SAMPLES * 4),
+        )
+
+    def stage_rate(self, stage):
+        rows = self._connect().execute(
+            "SELECT seconds / units FROM stage_durations WHERE stage = ? ORDER BY id DESC LIMIT ?",
+            (stage, STAGE_RATE_SAMPLES),
+        ).fetchall()
+        return statistics.median(row[0] for row in rows) if rows else None
+
+    def _maybe_purge(self, now):
+        if now - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.purge_expired()
+
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store():
+    """Return the process-wide job store selected by BRAINROT_JOB_STORE."""
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            if JOB_STORE_BACKEND == "memory":
+                _job_store = MemoryJobStore()
+            elif JOB_STORE_BACKEND == "sqlite":
+                _job_store = SQLiteJobStore()
+            else:
+                raise ValueError(f"Unknown BRAINROT_JOB_STORE backend: {JOB_STORE_BACKEND}")
+        return _job_store
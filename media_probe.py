@@ -0,0 +1,95 @@
+"""
+Skibidi-fication 3000 - Media probe
+===================================
+Container metadata without decoding.
+
+probe_media() asks ffprobe for the container and stream headers (one short
+subprocess, no decoder) and memoizes the result in memory keyed by path,
+mtime and size, so repeated lookups of the same background cost a stat().
+If ffprobe is not installed, MoviePy's header parser (ffmpeg -i) is used.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from collections import namedtuple
+from fractions import Fraction
+
+
+MediaInfo = namedtuple("MediaInfo", "duration fps width height video_codec audio_codec")
+
+_probes = {}
+_probes_lock = threading.Lock()
+
+
+def _parse_rate(rate):
+    """ffprobe frame rates are fractions like "30000/1001"; "0/0" means unknown."""
+    try:
+        value = Fraction(rate)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return float(value) if value > 0 else None
+
+
+def _ffprobe(path):
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+        check=True, capture_output=True, text=True
+    )
+    data = json.loads(result.stdout)
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    duration = data.get("format", {}).get("duration") or video.get("duration") or audio.get("duration")
+    return MediaInfo(
+        duration=float(duration) if duration else None,
+        fps=_parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")),
+        width=video.get("width"),
+        height=video.get("height"),
+        video_codec=video.get("codec_name"),
+        audio_codec=audio.get("codec_name"),
+    )
+
+
+def _moviepy_probe(path):
+    # Same location in MoviePy 1.x and 2.x; runs ffmpeg -i and parses its header dump
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    infos = ffmpeg_parse_infos(path)
+    size = infos.get("video_size") or (None, None)
+    return MediaInfo(
+        duration=infos.get("duration"),
+        fps=infos.get("video_fps"),
+        width=size[0],
+        height=size[1],
+        video_codec=infos.get("video_codec_name"),
+        audio_codec=infos.get("audio_codec_name"),
+    )
+
+
+def probe_media(path):
+    """
+    MediaInfo (duration, fps, width, height, codecs) for a media file.
+
+    Fields the file doesn't have (e.g. fps for audio) are None.
+    Raises subprocess.CalledProcessError if ffprobe cannot read the file.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _probes_lock:
+        info = _probes.get(key)
+    if info is not None:
+        return info
+
+    try:
+        info = _ffprobe(path)
+    except FileNotFoundError:
+        info = _moviepy_probe(path)
+
+    with _probes_lock:
+        _probes[key] = info
+    return info
@@ -0,0 +1,103 @@
+"""
+Skibidi-fication 3000 - Metrics
+===============================
+Prometheus metrics for the API process, served at /metrics.
+
+- brainrot_stage_seconds{stage}: wall time of extract, translate, tts,
+  render (including the wait for a render worker), encode (the render
+  worker's own time) and stream (the overlapped streaming pipeline)
+- brainrot_jobs_total{outcome}: finished jobs
+- brainrot_provider_call_seconds / brainrot_provider_errors_total: every
+  OpenAI attempt, via the provider_clients observer hook
+- brainrot_queue_depth, brainrot_jobs_in_flight, brainrot_renders_in_flight:
+  read from the scheduler at scrape time
+- brainrot_cache_*: hit/miss counters and hit ratio of every on-disk cache
+- brainrot_render_fps: output frames encoded per second of render time
+- brainrot_bytes_served_total{endpoint}: response bytes of video/HLS downloads
+
+Metrics are per process; with several API workers, scrape each one (or
+aggregate in Prometheus).
+"""
+
+import threading
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from brainrot_cache import all_cache_stats
+from provider_clients import add_call_observer
+
+
+STAGE_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200)
+PROVIDER_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+FPS_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800, 1600)
+
+STAGE_SECONDS = Histogram("brainrot_stage_seconds", "Wall time of each pipeline stage", ["stage"],
+                          buckets=STAGE_BUCKETS)
+JOBS = Counter("brainrot_jobs_total", "Finished jobs by outcome", ["outcome"])
+PROVIDER_CALL_SECONDS = Histogram("brainrot_provider_call_seconds", "Latency of each provider API attempt",
+                                  ["provider", "operation", "outcome"], buckets=PROVIDER_BUCKETS)
+PROVIDER_ERRORS = Counter("brainrot_provider_errors_total", "Failed provider API attempts (retried or not)",
+                          ["provider", "operation", "error"])
+RENDER_FPS = Histogram("brainrot_render_fps", "Output frames encoded per second of render time",
+                       buckets=FPS_BUCKETS)
+BYTES_SERVED = Counter("brainrot_bytes_served_total", "Response bytes of video and HLS downloads", ["endpoint"])
+QUEUE_DEPTH = Gauge("brainrot_queue_depth", "Jobs waiting for a worker")
+JOBS_IN_FLIGHT = Gauge("brainrot_jobs_in_flight", "Jobs being processed")
+RENDERS_IN_FLIGHT = Gauge("brainrot_renders_in_flight", "Render calls queued for or running in the render pool")
+
+
+class CacheCollector:
+    """Exports the on-disk caches' hit/miss counters at scrape time."""
+
+    def collect(self):
+        hits = CounterMetricFamily("brainrot_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("brainrot_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("brainrot_cache_hit_ratio", "Cache hits / lookups", labels=["cache"])
+        for stats in all_cache_stats():
+            hits.add_metric([stats["name"]], stats["hits"])
+            misses.add_metric([stats["name"]], stats["misses"])
+            ratio.add_metric([stats["name"]], stats["hit_ratio"])
+        yield hits
+        yield misses
+        yield ratio
+
+
+def observe_provider_call(call):
+    """provider_clients observer: record one API attempt."""
+    PROVIDER_CALL_SECONDS.labels(call.provider, call.operation, call.outcome).observe(call.seconds)
+    if call.outcome != "ok":
+        PROVIDER_ERRORS.labels(call.provider, call.operation, call.error).inc()
+
+
+def observe_stage(stage, seconds):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def observe_render(frames, seconds):
+    if frames and seconds > 0:
+        RENDER_FPS.observe(frames / seconds)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install(scheduler):
+    """Hook the metrics up to the provider clients, the scheduler and the caches (once per process)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+
+    add_call_observer(observe_provider_call)
+    QUEUE_DEPTH.set_function(lambda: scheduler.stats()["queued"])
+    JOBS_IN_FLIGHT.set_function(lambda: scheduler.stats()["running"])
+    RENDERS_IN_FLIGHT.set_function(lambda: scheduler.stats()["rendering"])
+    REGISTRY.register(CacheCollector())
+
+
+def render_latest():
+    """(body, content type) of the current metrics in the Prometheus text format."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
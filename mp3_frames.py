@@ -0,0 +1,231 @@
+"""
+Skibidi-fication 3000 - MP3 frames
+==================================
+Decode-free MP3 handling for the narration.
+
+An MP3 stream is a sequence of self-contained frames, each starting with a
+4-byte header that gives its length and sample count. Chunks encoded with
+the same settings (as every TTS response is) can therefore be joined by
+concatenating their frames, and the duration is just the number of samples
+divided by the sample rate - no decoding, no re-encoding.
+
+ID3v2/ID3v1 tags and the Xing/Info/VBRI header frame are dropped: tags would
+end up in the middle of the joined stream, and a Xing frame's frame count
+only describes its own chunk.
+
+Dropping the Info frame also drops its LAME tag, which tells decoders how
+many samples of encoder delay (at the start) and padding (at the end) to
+trim. In a joined stream they are played instead: each join leaves its
+chunks' padding and delay as a short silence (about 50 ms for a 24 kHz TTS
+chunk). Mp3Info.gap_samples counts that silence so callers can decide
+whether frame joining is good enough.
+"""
+
+from collections import namedtuple
+
+
+# delay/padding: samples a decoder trims at the start/end (from the LAME tag, else 0);
+# gap_samples: encoder delay/padding left playing at the joins of a concat_mp3 result
+Mp3Info = namedtuple("Mp3Info", "version layer sample_rate channels frames samples delay padding gap_samples")
+
+# MPEG version bits -> name
+VERSIONS = {0b00: "2.5", 0b10: "2", 0b11: "1"}
+# Layer bits -> layer
+LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+# Bitrates in kbps by (MPEG-1?, layer), indexed by the 4-bit bitrate index (0 = free format, 15 = invalid)
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {
+    "1": (44100, 48000, 32000),
+    "2": (22050, 24000, 16000),
+    "2.5": (11025, 12000, 8000),
+}
+
+FrameHeader = namedtuple("FrameHeader", "version layer sample_rate channels length samples side_info")
+
+
+def parse_frame_header(data, pos):
+    """The FrameHeader at data[pos:pos + 4], or None if there is no valid frame header there."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = VERSIONS.get((b1 >> 3) & 0b11)
+    layer = LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    # Free-format (0) frames have no length in the header; 15 is invalid
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == "1"
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 1
+    channels = 1 if (b3 >> 6) == 0b11 else 2
+
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 2 or mpeg1:
+        length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+    else:
+        length = 72 * bitrate // sample_rate + padding
+        samples = 576
+
+    # Layer III side information sits between the header and where a Xing/Info tag would start
+    if mpeg1:
+        side_info = 17 if channels == 1 else 32
+    else:
+        side_info = 9 if channels == 1 else 17
+
+    return FrameHeader(version, layer, sample_rate, channels, length, samples, side_info)
+
+
+def _audio_bounds(data):
+    """(start, end) of the frame data once ID3v2 (front) and ID3v1 (back) tags are skipped."""
+    start = 0
+    while data[start:start + 3] == b"ID3" and len(data) >= start + 10:
+        size = 0
+        for byte in data[start + 6:start + 10]:
+            size = (size << 7) | (byte & 0x7F)  # Syncsafe integer
+        footer = 10 if data[start + 5] & 0x10 else 0
+        start += 10 + size + footer
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return start, end
+
+
+def _is_info_frame(data, pos, header):
+    """True for the Xing/Info (LAME) or VBRI header frame that some encoders put first."""
+    tag = pos + 4 + header.side_info
+    return data[tag:tag + 4] in (b"Xing", b"Info") or data[pos + 36:pos + 40] == b"VBRI"
+
+
+def _encoder_delay(data, pos, header):
+    """(delay, padding) in samples from the LAME tag of an Info frame, or (0, 0) if it has none."""
+    tag = pos + 4 + header.side_info
+    if data[tag:tag + 4] not in (b"Xing", b"Info"):
+        return 0, 0  # VBRI
+    flags = int.from_bytes(data[tag + 4:tag + 8], "big")
+    lame = tag + 8
+    for flag, size in ((0x1, 4), (0x2, 4), (0x4, 100), (0x8, 4)):  # frames, bytes, TOC, quality
+        if flags & flag:
+            lame += size
+    if lame + 24 > pos + header.length or data[lame:lame + 4] not in (b"LAME", b"Lavf", b"Lavc"):
+        return 0, 0
+    b0, b1, b2 = data[lame + 21], data[lame + 22], data[lame + 23]
+    return (b0 << 4) | (b1 >> 4), ((b1 & 0x0F) << 8) | b2
+
+
+def scan_frames(data):
+    """
+    Locate the audio frames of an MP3 byte string.
+
+    Returns ([(offset, length), ...], Mp3Info). Junk between frames is
+    skipped and a truncated last frame is dropped.
+    Raises ValueError if no frames are found or the stream changes format.
+    """
+    data = memoryview(data)
+    pos, end = _audio_bounds(data)
+    frames = []
+    first = None
+    samples = 0
+    delay = padding = 0
+
+    while pos + 4 <= end:
+        header = parse_frame_header(data, pos)
+        if header is None or pos + header.length > end:
+            if header is not None:
+                break  # Truncated last frame
+            pos += 1  # Resync on the next frame header
+            continue
+
+        if first is None:
+            first = header
+            if header.layer == 3 and _is_info_frame(data, pos, header):
+                delay, padding = _encoder_delay(data, pos, header)
+                pos += header.length
+                continue
+        elif (header.sample_rate, header.channels, header.layer) != (first.sample_rate, first.channels, first.layer):
+            raise ValueError("MP3 stream changes sample rate, channels or layer mid-stream")
+
+        frames.append((pos, header.length))
+        samples += header.samples
+        pos += header.length
+
+    if not frames:
+        raise ValueError("No MP3 frames found")
+
+    return frames, Mp3Info(first.version, first.layer, first.sample_rate, first.channels, len(frames), samples,
+                           delay, padding, 0)
+
+
+def mp3_info(data):
+    """Mp3Info for MP3 bytes, from frame headers only."""
+    return scan_frames(data)[1]
+
+
+def mp3_duration(data):
+    """
+    Duration of MP3 bytes in seconds, from frame headers only.
+
+    Counts every frame, including encoder delay/padding: that is how long a
+    chunk lasts once frame-joined, which streamed segment timings add up to.
+    """
+    info = mp3_info(data)
+    return info.samples / info.sample_rate
+
+
+def mp3_file_duration(path):
+    with open(path, "rb") as f:
+        return mp3_duration(f.read())
+
+
+def concat_mp3(chunks):
+    """
+    Join MP3 byte strings into one MP3 stream by frame concatenation.
+
+    Returns (bytes, Mp3Info of the result). The result has no Info frame, so
+    its delay and padding are 0; the encoder delay/padding of the chunks is
+    all played, and the part of it between chunks is gap_samples.
+    Raises ValueError if the chunks are not all the same format.
+    """
+    parts = []
+    total = None
+    for chunk in chunks:
+        frames, info = scan_frames(chunk)
+        if total is None:
+            total = info._replace(delay=0, padding=0)
+            last_padding = info.padding
+        elif (info.layer, info.sample_rate, info.channels) != (total.layer, total.sample_rate, total.channels):
+            raise ValueError("MP3 chunks have different formats and cannot be joined without re-encoding")
+        else:
+            total = total._replace(frames=total.frames + info.frames, samples=total.samples + info.samples,
+                                   gap_samples=total.gap_samples + last_padding + info.delay)
+            last_padding = info.padding
+
+        # Frames are almost always back to back, so copy contiguous runs in one slice
+        view = memoryview(chunk)
+        run_start, run_end = frames[0][0], frames[0][0]
+        for offset, length in frames:
+            if offset != run_end:
+                parts.append(view[run_start:run_end])
+                run_start = offset
+            run_end = offset + length
+        parts.append(view[run_start:run_end])
+
+    if total is None:
+        raise ValueError("No MP3 chunks to join")
+
+    return b"".join(parts), total
@@ -0,0 +1,259 @@
+"""
+Skibidi-fication 3000 - Provider clients
+========================================
+Process-wide OpenAI clients shared by every job.
+
+- One keep-alive connection pool per API key, so concurrent jobs and TTS
+  workers reuse TLS connections instead of handshaking on every call.
+- Timeouts come from the environment (BRAINROT_OPENAI_*).
+- Retryable failures (429, 408/409, 5xx, connection errors and timeouts) are
+  retried here with jittered exponential backoff, honouring Retry-After. The
+  SDK's own retries are disabled so every attempt goes through the limiter.
+- Every call first reserves its share of a requests-per-minute and
+  tokens-per-minute budget. The budgets are shared by all threads of the
+  process; with several API worker processes, divide the limits accordingly.
+- Observers registered with add_call_observer() see every attempt
+  (latency, outcome), e.g. for metrics.
+- install_client_factory() swaps the real clients for stubs in benchmarks.
+- run_async() runs coroutines on one long-lived event loop, so the async
+  client and its connection pool are reused across calls instead of being
+  rebuilt (and leaked) by every asyncio.run().
+"""
+
+import os
+import random
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("BRAINROT_OPENAI_TIMEOUT", "120"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BRAINROT_OPENAI_CONNECT_TIMEOUT", "10"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("BRAINROT_OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_KEEPALIVE_SECONDS = 30.0
+
+MAX_RETRIES = int(os.getenv("BRAINROT_PROVIDER_MAX_RETRIES", "4"))
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 20.0
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Per-operation budgets as (requests per minute, tokens per minute); 0 means unlimited
+PROVIDER_LIMITS = {
+    "responses": (int(os.getenv("BRAINROT_OPENAI_RPM", "500")), int(os.getenv("BRAINROT_OPENAI_TPM", "200000"))),
+    # TTS is budgeted for the lowest usage tier; raise BRAINROT_TTS_RPM if the account allows more
+    "speech": (int(os.getenv("BRAINROT_TTS_RPM", "50")), 0),
+}
+
+ProviderCall = namedtuple("ProviderCall", "provider operation seconds outcome attempt error")
+
+
+class TokenBucket:
+    """Refills capacity units per minute; reservations may run it into debt."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount units now and return how many seconds to wait before using them."""
+        if self.capacity <= 0 or amount <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A single request larger than the whole budget still goes through, just slowly
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one operation."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def reserve(self, tokens=0):
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+
+_limiters = {name: RateLimiter(*limits) for name, limits in PROVIDER_LIMITS.items()}
+_observers = []
+_clients = {}
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {api_key: client}
+_client_factory = None
+_loop = None  # Shared event loop for run_async, started on first use
+_lock = threading.Lock()
+
+
+def _default_client_factory(api_key, is_async):
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+    limits = httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                          max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                          keepalive_expiry=OPENAI_KEEPALIVE_SECONDS)
+    timeout = httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+    if is_async:
+        return AsyncOpenAI(api_key=api_key, max_retries=0,
+                           http_client=httpx.AsyncClient(limits=limits, timeout=timeout))
+    return OpenAI(api_key=api_key, max_retries=0, http_client=httpx.Client(limits=limits, timeout=timeout))
+
+
+def install_client_factory(factory):
+    """
+    Build clients with factory(api_key, is_async) instead of the OpenAI SDK.
+
+    Pass None to restore the real clients. Already created clients are dropped.
+    """
+    global _client_factory
+    with _lock:
+        _client_factory = factory
+        _clients.clear()
+        _async_clients.clear()
+
+
+def get_openai_client(api_key=None):
+    """The process-wide OpenAI client for api_key (default: OPENAI_API_KEY)."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = (_client_factory or _default_client_factory)(api_key, False)
+            _clients[api_key] = client
+        return client
+
+
+def get_async_openai_client(api_key=None):
+    """
+    The AsyncOpenAI client for api_key on the running event loop.
+
+    Async connection pools are bound to their event loop, so there is one
+    client per loop; it is dropped together with the loop.
+    """
+    import asyncio
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            client = (_client_factory or _default_client_factory)(api_key, True)
+            clients[api_key] = client
+        return client
+
+
+def run_async(coro):
+    """
+    Run coro on the process-wide provider event loop and return its result.
+
+    Safe to call from any thread except the loop's own; concurrent callers
+    share the loop (and its AsyncOpenAI clients).
+    """
+    import asyncio
+
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="provider-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+def add_call_observer(observer):
+    """Call observer(ProviderCall) after every provider attempt."""
+    _observers.append(observer)
+
+
+def _notify(operation, started, outcome, attempt, error=None):
+    call = ProviderCall("openai", operation, time.perf_counter() - started, outcome, attempt,
+                        type(error).__name__ if error is not None else None)
+    for observer in _observers:
+        try:
+            observer(call)
+        except Exception as e:
+            print(f"  > Provider call observer failed: {e}")
+
+
+def is_retryable(error):
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):  # Includes APITimeoutError
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and (status_code in RETRYABLE_STATUS_CODES or status_code >= 500)
+
+
+def retry_delay(error, attempt):
+    """Seconds to wait before retry number attempt + 1 (Retry-After wins if the server sent one)."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after is not None:
+            return min(RETRY_MAX_SECONDS, float(retry_after))
+    except ValueError:
+        pass
+    # Full jitter keeps concurrent jobs that failed together from retrying in lockstep
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def call_provider(operation, fn, *args, tokens=0, **kwargs):
+    """
+    Call fn(*args, **kwargs) within operation's rate budget, retrying retryable errors.
+
+    tokens is the request's estimated token cost for the TPM budget.
+    """
+    limiter = _limiters.get(operation)
+    for attempt in range(MAX_RETRIES + 1):
+        wait = limiter.reserve(tokens) if limiter else 0.0
+        if wait:
+            time.sleep(wait)
+
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            retry = attempt < MAX_RETRIES and is_retryable(e)
+            _notify(operation, started, "retry" if retry else "error", attempt, e)
+            if not retry:
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"  > {operation} call failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            continue
+
+        _notify(operation, started, "ok", attempt)
+        return result
+
+
+async def acall_provider(operation, fn, *args, tokens=0, **kwargs):
+    """call_provider for coroutine functions."""
+    import asyncio
+
+    limiter = _limiters.get(operation)
+    for attempt in range(MAX_RETRIES + 1):
+        wait = limiter.reserve(tokens) if limiter else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            retry = attempt < MAX_RETRIES and is_retryable(e)
+            _notify(operation, started, "retry" if retry else "error", attempt, e)
+            if not retry:
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"  > {operation} call failed ({type(e).__name__}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            continue
+
+        _notify(operation, started, "ok", attempt)
+        return result
@@ -0,0 +1,210 @@
+"""
+Skibidi-fication 3000 - Render worker
+=====================================
+Entry points that run inside the scheduler's render process pool.
+
+Render progress comes from the encoder itself (FFmpeg -progress output or
+MoviePy's frame counter) and is written straight to the shared job store,
+together with an ETA extrapolated from the observed encode speed.
+
+Profiled jobs also get a cProfile of the render and per-frame statistics,
+saved next to the video (see write_profile_report).
+
+warm_up() is the render pool's process initializer: it pays for the module
+imports (numpy, PIL, MoviePy), the caption font, the job store connection and
+the background metadata once per worker, before the first job arrives.
+"""
+
+import json
+import os
+import time
+
+from job_store import get_job_store
+
+
+# The render stage covers this slice of the overall job progress bar
+RENDER_PROGRESS_START = 65
+RENDER_PROGRESS_END = 99
+
+# Don't write progress to the job store more often than this
+PROGRESS_UPDATE_INTERVAL = 1.0
+
+# Below this fraction the encode speed is too noisy to extrapolate from
+MIN_FRACTION_FOR_ETA = 0.02
+
+# Functions listed in a profile report, by cumulative and by own time
+PROFILE_TOP_FUNCTIONS = 40
+
+
+def _top_functions(stats, sort_by):
+    """The PROFILE_TOP_FUNCTIONS heaviest entries of pstats data, sorted by "cumulative" or "own" time."""
+    rows = []
+    for (filename, line, name), (primitive_calls, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "own_seconds": round(own, 4),
+            "cumulative_seconds": round(cumulative, 4),
+        })
+    key = "cumulative_seconds" if sort_by == "cumulative" else "own_seconds"
+    return sorted(rows, key=lambda row: row[key], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+
+
+def write_profile_report(profiler, frame_stats, profile_path, render_seconds, frames):
+    """
+    Save a render profile as profile_path + ".prof" (pstats) and ".json" (summary).
+
+    The profile covers this worker's thread only: FFmpeg encodes and the
+    caption pre-render pool show up as time spent waiting on them. The
+    encoder's own per-frame cost is in frame_stats (from FFmpeg's progress
+    reports, or per make_frame call on the MoviePy path). Without a profiler
+    (another render was being profiled) only the JSON is written, with no
+    function lists.
+    """
+    import pstats
+
+    top_cumulative = top_own = None
+    if profiler is not None:
+        profiler.dump_stats(profile_path + ".prof")
+        stats = pstats.Stats(profiler)
+        top_cumulative = _top_functions(stats, "cumulative")
+        top_own = _top_functions(stats, "own")
+
+    report = {
+        "render_seconds": round(render_seconds, 3),
+        "frames": frames,
+        "ms_per_frame": round(render_seconds / frames * 1000, 3) if frames else None,
+        "frame_stats": frame_stats.summary(),
+        "top_cumulative": top_cumulative,
+        "top_own": top_own,
+    }
+    with open(profile_path + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def warm_up(background_video=None):
+    """
+    Load what every render needs so a job doesn't pay for it.
+
+    Never raises: an exception in a pool initializer breaks the whole pool,
+    and anything skipped here is simply loaded by the first job instead.
+    """
+    started = time.perf_counter()
+    try:
+        import brainrot_turbo
+
+        get_job_store()
+        if background_video and os.path.exists(background_video):
+            # The API process prepared the background at startup, so this reads its sidecar
+            brainrot_turbo.prepare_background(background_video)
+
+        # brainrot_turbo imports these lazily; the caption pre-render and the MoviePy fallback need them
+        import numpy
+        import PIL.Image
+        try:
+            import moviepy.editor
+        except ImportError:
+            import moviepy
+        brainrot_turbo.load_caption_font()
+    except Exception as e:
+        print(f"  > Render worker warm-up incomplete: {e}")
+        return
+    print(f"  > Render worker {os.getpid()} ready in {time.perf_counter() - started:.2f}s")
+
+
+def render_job(job_id, background_video, audio_path, brainrot_text, output_path, hls_dir=None, hls_url=None,
+               render_mode="single", profile_path=None, segments=None):
+    """
+    Render a job's video, reporting real encoder progress to the job store.
+
+    render_mode "single" runs one FFmpeg encode; "parallel" encodes segments
+    (default RENDER_SEGMENTS of them) side by side and joins them (see
+    create_video_with_audio_parallel).
+    With hls_dir (single mode only), an HLS rendition is written alongside
+    the MP4 and hls_url is published on the job as soon as its playlist
+    exists, so playback can start while the render is still running.
+    With profile_path, the render runs under cProfile and a report is
+    written with write_profile_report.
+
+    Returns a dict with the audio duration, render wall time and output
+    frame count so the caller can record the stage duration for future
+    ETAs and the render speed.
+    """
+    from brainrot_turbo import (
+        HLS_PLAYLIST_NAME,
+        FrameStats,
+        create_video_with_audio_ffmpeg,
+        create_video_with_audio_parallel,
+        get_audio_duration,
+        prepare_background,
+    )
+
+    job_store = get_job_store()
+    audio_duration = get_audio_duration(audio_path)
+    started = time.time()
+    last_update = 0.0
+    hls_published = False
+
+    def report_progress(fraction):
+        nonlocal last_update, hls_published
+        now = time.time()
+        if now - last_update < PROGRESS_UPDATE_INTERVAL and fraction < 1.0:
+            return
+        last_update = now
+
+        fields = {
+            "progress": int(RENDER_PROGRESS_START + (RENDER_PROGRESS_END - RENDER_PROGRESS_START) * fraction),
+            "step": f"🎬 Rendering video... ({int(fraction * 100)}%)",
+            "render_fraction": round(fraction, 4),
+        }
+        if hls_dir and not hls_published and os.path.exists(os.path.join(hls_dir, HLS_PLAYLIST_NAME)):
+            fields["hls_url"] = hls_url
+            hls_published = True
+        if fraction >= MIN_FRACTION_FOR_ETA:
+            elapsed = now - started
+            fields["eta_deadline"] = now + elapsed * (1.0 - fraction) / fraction
+        job_store.update(job_id, **fields)
+
+    profiler = None
+    frame_stats = None
+    if profile_path:
+        import cProfile
+
+        frame_stats = FrameStats()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active cProfile per process, and with the memory
+            # job store renders are threads of the API process - keep the frame stats
+            print(f"  > Not profiling job {job_id} ({e}) - frame stats only")
+            profiler = None
+
+    try:
+        if render_mode == "parallel":
+            create_video_with_audio_parallel(background_video, audio_path, brainrot_text, output_path,
+                                             progress_callback=report_progress, segments=segments,
+                                             frame_stats=frame_stats)
+        else:
+            create_video_with_audio_ffmpeg(background_video, audio_path, brainrot_text, output_path,
+                                           progress_callback=report_progress, hls_dir=hls_dir,
+                                           frame_stats=frame_stats)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    render_seconds = time.time() - started
+    _, background = prepare_background(background_video)  # Memoized - just the fps
+    frames = int(audio_duration * background["fps"])
+
+    if profile_path:
+        write_profile_report(profiler, frame_stats, profile_path, render_seconds, frames)
+
+    return {
+        "output_path": output_path,
+        "audio_duration": audio_duration,
+        "render_seconds": render_seconds,
+        "frames": frames,
+    }